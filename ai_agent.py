@@ -1,60 +1,167 @@
 from langchain_ollama import ChatOllama
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from typing import Dict, Any, List
+from langchain_core.runnables import Runnable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, AsyncIterator, Callable, Iterator, Optional, Tuple
+import asyncio
+import contextvars
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
 
+import profiling
+from deadline import DeadlineExceeded, SharedDeadline, current as current_deadline
+from llm_cache import AsyncSingleFlight, LLMCache, SingleFlight
+from skill_taxonomy import SkillTaxonomy, merge_categories
+from metrics import AGENT_COALESCED, AGENT_DEGRADED, AGENT_ESCALATIONS, AGENT_FALLBACKS, AGENT_REUSED, MODEL_CALLS, SKILLS_CATEGORIZED, AGENT_STAGE_LATENCY, instrument, record_usage
 
-class ResumeAIAgent:
+
+SENTENCE_END = re.compile(r"[.!](?:\s|$)")
+# Chunk marker for _stream: the routed model failed validation and the main model starts over
+RESTART = object()
+END = object()
+BATCH_MARKER = re.compile(r"^\s*=+\s*ENTRY\s+(\d+)\s*=+\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+# Shared by every prompt; keep it free of per-call data so it stays a cacheable prefix
+SYSTEM_RULES = """You write content for professional resumes.
+General rules:
+- Tone: formal, concise, resume-appropriate.
+- Use only the information provided. Do NOT invent details.
+- Do NOT ask for more information, mention missing details, or output instructions or questions.
+- Do NOT add explanations, headers, notes, or prefaces like "Here are...".
+- Output only the requested text."""
+
+# Completions only need a few sentences or bullets; cap them so a rambling answer
+# can't run for seconds before the safety net discards it. Batch budgets are per entry.
+# Stops catch trailing commentary after a blank line without cutting the answer itself.
+COMMENTARY_STOPS = ["\n\nNote", "\n\nThis ", "\n\nThese ", "\n\nI ", "\n\nLet me", "\n\nIf you", "\n\n("]
+GENERATION_LIMITS = {
+    "summary": {"num_predict": 160, "stop": COMMENTARY_STOPS},
+    "experience": {"num_predict": 120, "stop": COMMENTARY_STOPS},
+    "skills": {"num_predict": 200, "stop": COMMENTARY_STOPS},
+    "projects": {"num_predict": 100, "stop": COMMENTARY_STOPS},
+    "experience_batch": {"num_predict": 120, "stop": []},
+    "projects_batch": {"num_predict": 100, "stop": []},
+}
+
+# ChatOllama fields sent as Ollama options; per-call options replace them, so they are carried along
+MODEL_OPTIONS = ("mirostat", "mirostat_eta", "mirostat_tau", "num_ctx", "num_gpu", "num_thread", "num_predict",
+                 "repeat_last_n", "repeat_penalty", "temperature", "seed", "stop", "tfs_z", "top_k", "top_p")
+
+
+def fingerprint(value: Any) -> str:
+    """Short stable hash of JSON-shaped data."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class _Call:
+    """One model call of a section: its prompt and inputs, and finish(text) -> the section's result."""
+    def __init__(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any], finish: Callable[[str], Any]):
+        self.section = section
+        self.prompt = prompt
+        self.inputs = inputs
+        self.finish = finish
+
+
+class _ResumePlan:
+    """What enhance_resume reuses from `previous`; None/pending entries still need the model."""
     def __init__(self):
-        self.llm = ChatOllama(model="llama3.2", temperature=0.7)
+        self.summary = None
+        self.skills = None
+        # section -> (results so far, indices still to enhance, those entries)
+        self.entries = {}
+        # The `inputs` tuple _resume_result() expects
+        self.fingerprints = None
+
+
+class ResumeAIAgent:
+    def __init__(self, max_concurrency: int = 4, batch_entries: bool = False,
+                 cache: Optional[LLMCache] = None, deterministic: bool = False, llm: Optional[Runnable] = None,
+                 keep_alive: Optional[str] = None, num_ctx: int = 4096,
+                 generation_limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 taxonomy: Optional[SkillTaxonomy] = None, section_llms: Optional[Dict[str, Runnable]] = None):
+        # Deterministic mode pins temperature to 0 so cached completions are meaningful
+        self.model_name = "llama3.2"
+        self.temperature = 0.0 if deterministic else 0.7
+        if llm is None:
+            # keep_alive keeps the model resident in Ollama between requests (e.g. "30m")
+            llm = ChatOllama(model=self.model_name, temperature=self.temperature, keep_alive=keep_alive)
+        else:
+            # Any Runnable chat backend (llm_backend.OllamaRouter, FakeLLM, ...)
+            self.model_name = getattr(llm, "model", self.model_name)
+            self.temperature = getattr(llm, "temperature", self.temperature)
+        self.llm = llm
+        # Cheaper backends for some sections ("projects", "experience", ...); output that
+        # fails _is_valid() is regenerated on self.llm
+        self.section_llms = dict(section_llms or {})
         self.parser = StrOutputParser()
+        self.cache = cache
+        # Identical prompts already running (double-clicks, duplicate tabs) share one generation
+        self._in_flight = SingleFlight()
+        self._async_in_flight = AsyncSingleFlight()
+
+        # Bounded pool shared by every fan-out below; caps the Ollama calls one agent method runs at once
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="resume-ai")
+        # Chunk reads of model streams under a request deadline, so the caller can stop waiting.
+        # Each stream has at most one read pending; a stream given up on is closed once it returns
+        self._calls = ThreadPoolExecutor(max_workers=8 * self.max_concurrency, thread_name_prefix="resume-ai-call")
+
+        # Pack all experience/project entries of a resume into one prompt
+        self.batch_entries = batch_entries
+
+        # One context size for every call: Ollama reloads the model whenever num_ctx changes
+        self.num_ctx = num_ctx
+        self.generation_limits = {**GENERATION_LIMITS, **(generation_limits or {})}
+
+        # Known skills are categorized locally; only the rest go to the model
+        self.taxonomy = taxonomy if taxonomy is not None else SkillTaxonomy()
 
 
         #Templates
+        # Every prompt is [shared system rules] + [static section rules] + [resume data last],
+        # so consecutive calls share a token prefix Ollama can keep in its KV cache.
         #Summary
-        self.summary_prompt = ChatPromptTemplate.from_template("""
-        Write a short professional summary for {name}.
-
-        Details:
-        - Experience: {experience}
-        - Skills: {skills}
-        - Education: {education}
+        self.summary_prompt = self._prompt("""
+        Write a short professional summary.
 
         Rules:
         - Strictly 2–3 sentences.
-        - Tone: formal, concise, resume-appropriate.
         - Use provided experience, skills, and education when available.
         - If little or no information is provided, generate a generic professional summary.
-        - Do NOT ask for more information.
-        - Do NOT mention missing details.
-        - Do NOT output instructions or questions.
         Output only the summary text.
+
+        Name: {name}
+        Experience: {experience}
+        Skills: {skills}
+        Education: {education}
         """)
 
         # Experience
-        self.experience_prompt = ChatPromptTemplate.from_template("""
+        self.experience_prompt = self._prompt("""
         Enhance this work experience into exactly 3 concise bullet points.
 
-        Job Title: {job_title}
-        Company: {company}
-        Duration: {duration}
-        Basic Description: {basic_description}
-
         Rules:
         - Max 15 words per bullet.
         - Begin each bullet with a strong action verb.
-        - Use only the provided info.
-        - Do NOT invent details.
-        - Do NOT add explanations, headers, or prefaces like "Here are...".
         - Output ONLY the 3 bullet points, one per line, starting with "- ".
+
+        Job Title: {job_title}
+        Company: {company}
+        Duration: {duration}
+        Basic Description: {basic_description}
         """)
 
         # Skills
-        self.skills_prompt = ChatPromptTemplate.from_template("""
+        self.skills_prompt = self._prompt("""
         Organize the following skills into categories.
 
-        Skills: {skills_list}
-
         Rules:
         - Categories: Programming Languages, Frameworks/Tools, Soft Skills.
         - Max 6 skills per category.
@@ -64,94 +171,808 @@ class ResumeAIAgent:
 
         Format:
         Category: skill1, skill2
+
+        Skills: {skills_list}
         """)
 
         # Projects
-        self.project_prompt = ChatPromptTemplate.from_template("""
-        Write a concise description for the project "{title}" using {technologies}.
+        self.project_prompt = self._prompt("""
+        Write a concise description for the project below.
+
+        Rules:
         - Strictly 1–2 sentences.
         - Highlight functionality or impact only.
-        - If no description or technologies are provided, return "{title} was developed to demonstrate practical application of technical skills."
+        - If no technologies are provided, return "<title> was developed to demonstrate practical application of technical skills."
+
+        Title: {title}
+        Technologies: {technologies}
+        """)
+
+        # Batched variants: one request for every entry of a resume
+        self.experience_batch_prompt = self._prompt("""
+        Enhance each of the following work experiences into exactly 3 concise bullet points.
+
+        Rules:
+        - Max 15 words per bullet.
+        - Begin each bullet with a strong action verb.
+        - Use only the provided info for each entry.
+        - Answer every entry, in the same order, starting each one with its marker line "=== ENTRY <number> ===".
+        - Under each marker output ONLY the 3 bullet points, one per line, starting with "- ".
+
+        {entries}
+        """)
+
+        self.project_batch_prompt = self._prompt("""
+        Write a concise description for each of the following projects.
+
+        Rules:
+        - Strictly 1–2 sentences per project.
+        - Highlight functionality or impact only.
+        - If a project has no technologies, return "<title> was developed to demonstrate practical application of technical skills."
+        - Answer every entry, in the same order, starting each one with its marker line "=== ENTRY <number> ===".
+        - Under each marker output ONLY the description text.
+
+        {entries}
         """)
 
     #Methods
+    def warm_up(self) -> None:
+        """Load the model into Ollama with a one-token completion so the first user call skips the load."""
+        # Same num_ctx as real calls, or the first one would reload the model anyway
+        options = {"num_predict": 1, "num_ctx": self.num_ctx}
+        for llm in {id(llm): llm for llm in [self.llm, *self.section_llms.values()]}.values():
+            if hasattr(llm, "warm_up"):
+                llm.warm_up(options)
+            else:
+                llm.invoke("Reply with OK.", options=options)
 
+    @instrument("enhance_summary")
     def enhance_summary(self, data: Dict[str, Any]) -> str:
-        chain = self.summary_prompt | self.llm | self.parser
-        result = chain.invoke({
-            "name": data.get("personalInfo", {}).get("name", "the candidate"),
+        return self._run(self._plan_summary(data))
+
+    @instrument("enhance_experience")
+    def enhance_experience(self, experience_list: List[Dict[str, Any]],
+                           previous: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """previous is an earlier {"experience": [...], "fingerprints": [...]} response; unchanged entries are reused."""
+        return self._enhance_entries("experience", experience_list, previous)
+
+    @instrument("organize_skills")
+    def organize_skills(self, skills_list: List[str]) -> Dict[str, List[str]]:
+        return self._run(self._plan_skills(skills_list))
+
+    @instrument("enhance_projects")
+    def enhance_projects(self, projects_list: List[Dict[str, Any]],
+                         previous: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """previous is an earlier {"projects": [...], "fingerprints": [...]} response; unchanged entries are reused."""
+        return self._enhance_entries("projects", projects_list, previous)
+
+    def _enhance_entry(self, section: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return self._run(self._plan_entry(section, entry))
+
+    def _enhance_entries(self, section: str, entries: List[Dict[str, Any]],
+                         previous: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        previous = previous or {}
+        results, changed, _ = self._reuse_entries(section, entries, previous.get(section), previous.get("fingerprints"))
+        pending = [entries[i] for i in changed]
+        if self.batch_entries:
+            enhanced = self._enhance_batch(section, pending)
+        else:
+            enhanced = self._map(lambda entry: self._enhance_entry(section, entry), pending)
+        return self._merge_entries(results, changed, enhanced)
+
+    def _enhance_batch(self, section: str, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        plan = self._plan_batch(section, entries)
+        if plan is None:
+            return self._map(lambda entry: self._enhance_entry(section, entry), entries)
+        # Only the entries that failed to parse pay for a second call, fanned out like _aenhance_batch
+        self._map(lambda entry: self._enhance_entry(section, entry), self._run(plan))
+        return list(entries)
+
+    @instrument("enhance_resume")
+    def enhance_resume(self, data: Dict[str, Any],
+                       on_section: Optional[Callable[[str, Optional[int]], None]] = None,
+                       previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run every section enhancement concurrently through the shared pool.
+        Each experience/project entry is its own task, so the whole resume
+        costs roughly one model round-trip when the pool is wide enough.
+
+        on_section(section, index) is called from the pool as each task finishes;
+        index is None for summary/skills and for a whole batched section.
+
+        previous is an earlier return value of this method. Entries whose
+        fingerprint matches its input or output are copied instead of re-run, and
+        the summary and skills are only regenerated when what they depend on changed.
+        """
+        plan = self._plan_resume(data, previous, on_section)
+
+        def submit(section, index, fn, *args):
+            if on_section is None:
+                return self._submit(fn, *args)
+
+            def task():
+                # Report inside the task so progress lands before .result() returns
+                result = fn(*args)
+                on_section(section, index)
+                return result
+            return self._submit(task)
+
+        def reused(value):
+            future = Future()
+            future.set_result(value)
+            return future
+
+        summary_future = reused(plan.summary) if plan.summary is not None else submit("summary", None, self.enhance_summary, data)
+        skills_future = reused(plan.skills) if plan.skills is not None else submit("skills", None, self.organize_skills, data.get("skills", []))
+
+        def entries_future(section):
+            results, changed, pending = plan.entries[section]
+            if self.batch_entries:
+                batch = submit(section, None, self._enhance_batch, section, pending) if pending else None
+                return lambda: self._merge_entries(results, changed, batch.result() if batch else [])
+            futures = [submit(section, i, self._enhance_entry, section, entry) for i, entry in zip(changed, pending)]
+            return lambda: self._merge_entries(results, changed, [f.result() for f in futures])
+
+        collect_experience = entries_future("experience")
+        collect_projects = entries_future("projects")
+        enhanced_experience = collect_experience()
+        enhanced_projects = collect_projects()
+        return self._resume_result(data, summary_future.result(), skills_future.result(), enhanced_experience, enhanced_projects,
+                                   plan.fingerprints)
+
+    #Fingerprints
+    # An entry's fingerprint covers exactly what its prompt reads. Each enhanced entry
+    # stores {"input", "output"} so a client echoing either version back is a match.
+
+    def entry_fingerprints(self, section: str, entries: List[Dict[str, Any]]) -> List[str]:
+        inputs = self._experience_inputs if section == "experience" else self._project_inputs
+        return [fingerprint(inputs(entry)) for entry in entries]
+
+    def pair_fingerprints(self, section: str, inputs: List[str], outputs: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        # Fallback text from a missed deadline must not be reused; without fingerprints the
+        # next request regenerates the section (entries that did finish come from the cache)
+        if section in self._degraded_sections():
+            return []
+        return [{"input": before, "output": after} for before, after in zip(inputs, self.entry_fingerprints(section, outputs))]
+
+    def _plan_resume(self, data: Dict[str, Any], previous: Optional[Dict[str, Any]],
+                     on_section: Optional[Callable[[str, Optional[int]], None]]) -> "_ResumePlan":
+        """Decide, for enhance_resume and aenhance_resume alike, what `previous` already answers."""
+        previous = previous or {}
+        fingerprints = previous.get("fingerprints") if isinstance(previous.get("fingerprints"), dict) else {}
+        plan = _ResumePlan()
+
+        def reuse(section, value):
+            AGENT_REUSED.inc(section=section)
+            if on_section is not None:
+                on_section(section, None)
+            return value
+
+        summary_fingerprint = self._summary_fingerprint(data)
+        if previous.get("summary") and self._matches(fingerprints.get("summary"), summary_fingerprint):
+            plan.summary = reuse("summary", previous["summary"])
+
+        skills_fingerprint = fingerprint(self._normalize_skills(data.get("skills", [])))
+        if isinstance(previous.get("skills"), dict) and self._matches(fingerprints.get("skills"), skills_fingerprint):
+            plan.skills = reuse("skills", previous["skills"])
+
+        inputs = {}
+        for section in ("experience", "projects"):
+            entries = data.get(section, [])
+            results, changed, inputs[section] = self._reuse_entries(section, entries, previous.get(section), fingerprints.get(section), on_section)
+            plan.entries[section] = (results, changed, [entries[i] for i in changed])
+        plan.fingerprints = (summary_fingerprint, skills_fingerprint, inputs["experience"], inputs["projects"])
+        return plan
+
+    def _reuse_entries(self, section: str, entries: List[Dict[str, Any]], previous_entries: Any, previous_fingerprints: Any,
+                       on_section: Optional[Callable[[str, Optional[int]], None]] = None) -> Tuple[List[Dict[str, Any]], List[int], List[str]]:
+        """Copy entries that match a previous one; returns (results, indices still to enhance, input fingerprints)."""
+        known = {}
+        if isinstance(previous_entries, list) and isinstance(previous_fingerprints, list):
+            for entry, pair in zip(previous_entries, previous_fingerprints):
+                if isinstance(entry, dict) and isinstance(pair, dict):
+                    for value in (pair.get("input"), pair.get("output")):
+                        if value:
+                            known[value] = entry
+
+        inputs = self.entry_fingerprints(section, entries)
+        results, changed = [], []
+        for index, (entry, value) in enumerate(zip(entries, inputs)):
+            prior = known.get(value)
+            if prior is None:
+                results.append(entry)
+                changed.append(index)
+                continue
+            results.append(dict(prior))
+            AGENT_REUSED.inc(section=section)
+            if on_section is not None:
+                on_section(section, index)
+        return results, changed, inputs
+
+    def _resume_result(self, data: Dict[str, Any], summary: str, skills: Dict[str, List[str]],
+                       experience: List[Dict[str, Any]], projects: List[Dict[str, Any]], inputs: Tuple) -> Dict[str, Any]:
+        summary_fingerprint, skills_fingerprint, experience_inputs, project_inputs = inputs
+        flat_skills = [skill for group in skills.values() for skill in group]
+        degraded = self._degraded_sections()
+        return {
+            "summary": summary,
+            "experience": experience,
+            "skills": skills,
+            "projects": projects,
+            "fingerprints": {
+                "summary": None if "summary" in degraded else
+                           {"input": summary_fingerprint, "output": self._summary_fingerprint({**data, "skills": flat_skills})},
+                "skills": None if "skills" in degraded else
+                          {"input": skills_fingerprint, "output": fingerprint(self._normalize_skills(flat_skills))},
+                "experience": self.pair_fingerprints("experience", experience_inputs, experience),
+                "projects": self.pair_fingerprints("projects", project_inputs, projects),
+            },
+            # Sections whose model call missed the request deadline and hold safety-net text
+            "degraded": degraded,
+        }
+
+    def _merge_entries(self, results: List[Dict[str, Any]], changed: List[int], enhanced: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for index, entry in zip(changed, enhanced):
+            results[index] = entry
+        return results
+
+    def _summary_fingerprint(self, data: Dict[str, Any]) -> str:
+        # Only what the summary prompt reads; enhanced descriptions don't count
+        return fingerprint({
+            "name": data.get("personalInfo", {}).get("name", ""),
             "experience": self._summarize_experience(data.get("experience", [])),
-            "skills": ", ".join(data.get("skills", [])) or "general skills",
+            "skills": self._normalize_skills(data.get("skills", [])),
             "education": self._summarize_education(data.get("education", [])),
-        }).strip()
+        })
 
-        # --- SAFETY NET ---
-        if not result or "i don't have" in result.lower() or "please provide" in result.lower():
-            return "Motivated professional eager to contribute skills and grow within a dynamic organization."
-        return result
+    def _normalize_skills(self, skills: List[str]) -> List[str]:
+        # organize_skills may reorder or regroup; the set of skills is what matters
+        return sorted({skill.strip().lower() for skill in skills if skill.strip()})
 
-    def enhance_experience(self, experience_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        enhanced = []
-        chain = self.experience_prompt | self.llm | self.parser
+    def _matches(self, stored: Any, value: str) -> bool:
+        return isinstance(stored, dict) and value in (stored.get("input"), stored.get("output"))
 
-        for exp in experience_list:
-            if exp.get("jobTitle") or exp.get("company"):
-                desc = chain.invoke({
-                    "job_title": exp.get("jobTitle", "Role"),
-                    "company": exp.get("company", "Company"),
-                    "duration": exp.get("duration", ""),
-                    "basic_description": exp.get("description", "") or ""
-                }).strip()
+    #Streaming
+    # Each generator yields {"event": "token", ...} chunks as the model produces them,
+    # then one {"event": "section", ...} carrying the final post-safety-net result.
 
-                # --- SAFETY NET ---
-                if not desc or "please provide" in desc.lower() or "i don't have" in desc.lower():
-                    desc = "- Assisted with daily tasks and supported team projects.\n- Contributed to assigned responsibilities.\n- Gained practical exposure in the role."
+    @instrument("stream_summary")
+    def stream_summary(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        yield from self._run_stream("summary", None, self._plan_summary(data))
 
-                exp["description"] = desc
-            enhanced.append(exp)
+    @instrument("stream_experience")
+    def stream_experience(self, experience_list: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for index, exp in enumerate(experience_list):
+            yield from self._stream_entry("experience", index, exp)
 
-        return enhanced
+    @instrument("stream_skills")
+    def stream_skills(self, skills_list: List[str]) -> Iterator[Dict[str, Any]]:
+        yield from self._run_stream("skills", None, self._plan_skills(skills_list))
 
-    def organize_skills(self, skills_list: List[str]) -> Dict[str, List[str]]:
+    @instrument("stream_projects")
+    def stream_projects(self, projects_list: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for index, proj in enumerate(projects_list):
+            yield from self._stream_entry("projects", index, proj)
+
+    def _stream_entry(self, section: str, index: int, entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        yield from self._run_stream(section, index, self._plan_entry(section, entry))
+
+    @instrument("stream_resume")
+    def stream_resume(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of enhance_resume. Sections run concurrently in the
+        shared pool and their events are interleaved as they arrive; a final
+        {"event": "done"} carries the same dict enhance_resume returns.
+        """
+        streams = self._resume_streams(data, self.stream_summary, self.stream_skills, self._stream_entry)
+        events = queue.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def pump(stream):
+            try:
+                for event in stream:
+                    # The consumer went away: stop between chunks and leave the model call; it is
+                    # only closed if no other request shares it (llm_cache.SingleFlight)
+                    if stop.is_set():
+                        break
+                    events.put(event)
+            except Exception as e:
+                events.put({"event": "error", "error": str(e)})
+            finally:
+                # A generator can only be closed by the thread running it
+                stream.close()
+                events.put(finished)
+
+        pumps = [(self._submit(pump, stream), stream) for stream in streams]
+        try:
+            result = self._stream_result(data)
+            remaining = len(streams)
+            while remaining:
+                event = events.get()
+                if event is finished:
+                    remaining -= 1
+                    continue
+                self._collect_section(result, event)
+                yield event
+            yield self._done_event(result)
+        finally:
+            # Free the shared pool for other requests when the client disconnects early
+            stop.set()
+            for future, stream in pumps:
+                if future.cancel():
+                    stream.close()
+
+    def _resume_streams(self, data: Dict[str, Any], summary: Callable, skills: Callable, entry: Callable) -> List[Any]:
+        # One stream per section and per entry, sync or async alike
+        streams = [summary(data), skills(data.get("skills", []))]
+        for section in ("experience", "projects"):
+            streams += [entry(section, i, item) for i, item in enumerate(data.get(section, []))]
+        return streams
+
+    def _stream_result(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Entries are enhanced in place, so only summary and skills need collecting
+        return {"summary": "", "experience": data.get("experience", []), "skills": {}, "projects": data.get("projects", [])}
+
+    def _collect_section(self, result: Dict[str, Any], event: Dict[str, Any]) -> None:
+        if event["event"] == "section" and event["section"] in ("summary", "skills"):
+            result[event["section"]] = event["result"]
+
+    def _done_event(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        result["degraded"] = self._degraded_sections()
+        return {"event": "done", "result": result}
+
+    #Plans
+    # A section's model call as data: what to ask and how the completion becomes the
+    # section's result. The sync, async and streaming runners below differ only in how
+    # they make the call; when no call is needed the plan is the result itself.
+
+    def _plan_summary(self, data: Dict[str, Any]) -> "_Call":
+        return _Call("summary", self.summary_prompt, self._summary_inputs(data), self._finalize_summary)
+
+    def _plan_skills(self, skills_list: List[str]) -> Any:
         if not skills_list:
             return {"Soft Skills": ["Communication", "Teamwork", "Adaptability"]}
 
-        chain = self.skills_prompt | self.llm | self.parser
-        organized_text = chain.invoke({"skills_list": ", ".join(skills_list)}).strip()
+        known, unknown = self._categorize_skills(skills_list)
+        if not unknown:
+            return merge_categories(known)
+        return _Call("skills", self.skills_prompt, {"skills_list": ", ".join(unknown)},
+                     lambda text: self._parse_skills(text, unknown, known))
 
-        # --- SAFETY NET ---
-        if not organized_text or "please provide" in organized_text.lower() or "i don't have" in organized_text.lower():
-            return {"Soft Skills": ["Communication", "Teamwork", "Adaptability"]}
+    def _plan_entry(self, section: str, entry: Dict[str, Any]) -> Any:
+        if not self._enhanceable(section, entry):
+            return entry
+        if section == "experience":
+            prompt, inputs, finalize = self.experience_prompt, self._experience_inputs(entry), self._finalize_experience
+        else:
+            prompt, inputs, finalize = self.project_prompt, self._project_inputs(entry), lambda text: self._finalize_project(text, entry)
 
-        skills_dict = {}
-        for line in organized_text.split("\n"):
-            if ":" in line:
-                category, skills = line.split(":", 1)
-                skills_dict[category.strip()] = [s.strip() for s in skills.split(",") if s.strip()]
+        def finish(text):
+            entry["description"] = finalize(text)
+            return entry
+        return _Call(section, prompt, inputs, finish)
+
+    def _plan_batch(self, section: str, entries: List[Dict[str, Any]]) -> Optional["_Call"]:
+        """One call for every entry that needs the model; it returns the entries still needing their own. None below two."""
+        targets = [entry for entry in entries if self._enhanceable(section, entry)]
+        if len(targets) < 2:
+            return None
+        if section == "experience":
+            prompt, build, apply = self.experience_batch_prompt, self._experience_batch_entries, self._apply_experience_batch
+        else:
+            prompt, build, apply = self.project_batch_prompt, self._project_batch_entries, self._apply_projects_batch
+        return _Call(section + "_batch", prompt, {"entries": build(targets)}, lambda text: apply(targets, text))
 
-        return skills_dict if skills_dict else {"Skills": skills_list}
+    def _enhanceable(self, section: str, entry: Dict[str, Any]) -> bool:
+        if section == "experience":
+            return bool(entry.get("jobTitle") or entry.get("company"))
+        return bool(entry.get("title"))
 
-    def enhance_projects(self, projects_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        enhanced = []
-        chain = self.project_prompt | self.llm | self.parser
+    def _run(self, plan: Any) -> Any:
+        if not isinstance(plan, _Call):
+            return plan
+        return plan.finish(self._invoke(plan.section, plan.prompt, plan.inputs))
 
-        for proj in projects_list:
-            if proj.get("title"):
-                desc = chain.invoke({
-                    "title": proj.get("title", ""),
-                    "technologies": proj.get("technologies", "") or ""
-                }).strip()
+    def _run_stream(self, section: str, index: Optional[int], plan: Any) -> Iterator[Dict[str, Any]]:
+        result = plan
+        if isinstance(plan, _Call):
+            text = yield from self._stream(plan.section, index, plan.prompt, plan.inputs)
+            result = plan.finish(text)
+        yield self._section_event(section, index, result)
 
-                # --- SAFETY NET ---
-                if not desc or "please provide" in desc.lower() or "i don't have" in desc.lower():
-                    desc = f"{proj.get('title', 'Project')} was developed to demonstrate practical application of technical skills."
+    def _section_event(self, section: str, index: Optional[int], result: Any) -> Dict[str, Any]:
+        if index is None:
+            return {"event": "section", "section": section, "result": result}
+        return {"event": "section", "section": section, "index": index, "result": result}
+
+    #Batched
+    def _experience_batch_entries(self, targets: List[Dict[str, Any]]) -> str:
+        return "\n\n".join(
+            f"=== ENTRY {i} ===\n"
+            f"Job Title: {exp.get('jobTitle', 'Role')}\n"
+            f"Company: {exp.get('company', 'Company')}\n"
+            f"Duration: {exp.get('duration', '')}\n"
+            f"Basic Description: {exp.get('description', '') or ''}"
+            for i, exp in enumerate(targets, 1)
+        )
 
+    def _project_batch_entries(self, targets: List[Dict[str, Any]]) -> str:
+        return "\n\n".join(
+            f"=== ENTRY {i} ===\n"
+            f"Title: {proj.get('title', '')}\n"
+            f"Technologies: {proj.get('technologies', '') or ''}"
+            for i, proj in enumerate(targets, 1)
+        )
+
+    def _apply_experience_batch(self, targets: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+        # Fills in every entry the batch answered; returns the ones still needing their own call
+        blocks = self._split_batch(text)
+        failed = []
+        for i, exp in enumerate(targets, 1):
+            desc = blocks.get(i, "")
+            if self._is_unusable(desc) or not any(line.lstrip().startswith("-") for line in desc.split("\n")):
+                failed.append(exp)
+            else:
+                exp["description"] = desc
+        return failed
+
+    def _apply_projects_batch(self, targets: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+        blocks = self._split_batch(text)
+        failed = []
+        for i, proj in enumerate(targets, 1):
+            desc = blocks.get(i, "")
+            if self._is_unusable(desc):
+                failed.append(proj)
+            else:
                 proj["description"] = desc
-            enhanced.append(proj)
+        return failed
+
+    #Async
+    # Coroutine counterparts used by the ASGI server (asgi.py). They run the same plans
+    # as the sync methods; only the model call differs: it awaits the backend's
+    # ainvoke/astream, so a request waiting on Ollama holds no thread, and fan-out is
+    # asyncio.gather instead of the pool.
+
+    @instrument("enhance_summary")
+    async def aenhance_summary(self, data: Dict[str, Any]) -> str:
+        return await self._arun(self._plan_summary(data))
+
+    @instrument("enhance_experience")
+    async def aenhance_experience(self, experience_list: List[Dict[str, Any]],
+                                  previous: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return await self._aenhance_entries("experience", experience_list, previous)
+
+    @instrument("organize_skills")
+    async def aorganize_skills(self, skills_list: List[str]) -> Dict[str, List[str]]:
+        return await self._arun(self._plan_skills(skills_list))
+
+    @instrument("enhance_projects")
+    async def aenhance_projects(self, projects_list: List[Dict[str, Any]],
+                                previous: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return await self._aenhance_entries("projects", projects_list, previous)
+
+    async def _aenhance_entry(self, section: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._arun(self._plan_entry(section, entry))
+
+    async def _aenhance_entries(self, section: str, entries: List[Dict[str, Any]],
+                                previous: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        previous = previous or {}
+        results, changed, _ = self._reuse_entries(section, entries, previous.get(section), previous.get("fingerprints"))
+        pending = [entries[i] for i in changed]
+        if self.batch_entries:
+            enhanced = await self._aenhance_batch(section, pending)
+        else:
+            enhanced = await asyncio.gather(*(self._aenhance_entry(section, entry) for entry in pending))
+        return self._merge_entries(results, changed, list(enhanced))
+
+    async def _aenhance_batch(self, section: str, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        plan = self._plan_batch(section, entries)
+        if plan is None:
+            return list(await asyncio.gather(*(self._aenhance_entry(section, entry) for entry in entries)))
+        await asyncio.gather(*(self._aenhance_entry(section, entry) for entry in await self._arun(plan)))
+        return list(entries)
+
+    @instrument("enhance_resume")
+    async def aenhance_resume(self, data: Dict[str, Any],
+                              on_section: Optional[Callable[[str, Optional[int]], None]] = None,
+                              previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """enhance_resume() with every section and entry as a concurrent coroutine."""
+        plan = self._plan_resume(data, previous, on_section)
+
+        async def run(section, index, call):
+            result = await call
+            if on_section is not None:
+                on_section(section, index)
+            return result
+
+        async def section(name, reused, call):
+            if reused is not None:
+                return reused
+            return await run(name, None, call())
+
+        async def entries(section):
+            results, changed, pending = plan.entries[section]
+            if not self.batch_entries:
+                enhanced = await asyncio.gather(*(run(section, i, self._aenhance_entry(section, entry)) for i, entry in zip(changed, pending)))
+            elif pending:
+                enhanced = await run(section, None, self._aenhance_batch(section, pending))
+            else:
+                enhanced = []
+            return self._merge_entries(results, changed, list(enhanced))
+
+        summary, skills, experience, projects = await asyncio.gather(
+            section("summary", plan.summary, lambda: self.aenhance_summary(data)),
+            section("skills", plan.skills, lambda: self.aorganize_skills(data.get("skills", []))),
+            entries("experience"),
+            entries("projects"),
+        )
+        return self._resume_result(data, summary, skills, experience, projects, plan.fingerprints)
+
+    @instrument("stream_summary")
+    async def astream_summary(self, data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        async for event in self._arun_stream("summary", None, self._plan_summary(data)):
+            yield event
+
+    @instrument("stream_experience")
+    async def astream_experience(self, experience_list: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        for index, exp in enumerate(experience_list):
+            async for event in self._astream_entry("experience", index, exp):
+                yield event
+
+    @instrument("stream_skills")
+    async def astream_skills(self, skills_list: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        async for event in self._arun_stream("skills", None, self._plan_skills(skills_list)):
+            yield event
+
+    @instrument("stream_projects")
+    async def astream_projects(self, projects_list: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        for index, proj in enumerate(projects_list):
+            async for event in self._astream_entry("projects", index, proj):
+                yield event
 
-        return enhanced
+    async def _astream_entry(self, section: str, index: int, entry: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        async for event in self._arun_stream(section, index, self._plan_entry(section, entry)):
+            yield event
+
+    @instrument("stream_resume")
+    async def astream_resume(self, data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """stream_resume() with each section pumped by a task on the running loop."""
+        streams = self._resume_streams(data, self.astream_summary, self.astream_skills, self._astream_entry)
+        events = asyncio.Queue()
+        finished = object()
+
+        async def pump(stream):
+            try:
+                async for event in stream:
+                    await events.put(event)
+            except Exception as e:
+                await events.put({"event": "error", "error": str(e)})
+            finally:
+                await events.put(finished)
+
+        tasks = [asyncio.ensure_future(pump(stream)) for stream in streams]
+        try:
+            result = self._stream_result(data)
+            remaining = len(streams)
+            while remaining:
+                event = await events.get()
+                if event is finished:
+                    remaining -= 1
+                    continue
+                self._collect_section(result, event)
+                yield event
+            yield self._done_event(result)
+        finally:
+            # Client went away: stop generating for it
+            for task in tasks:
+                task.cancel()
+
+    async def _arun(self, plan: Any) -> Any:
+        if not isinstance(plan, _Call):
+            return plan
+        return plan.finish(await self._ainvoke(plan.section, plan.prompt, plan.inputs))
+
+    async def _arun_stream(self, section: str, index: Optional[int], plan: Any) -> AsyncIterator[Dict[str, Any]]:
+        result = plan
+        if isinstance(plan, _Call):
+            chunks = []
+            async for event in self._astream(plan.section, index, plan.prompt, plan.inputs, chunks):
+                yield event
+            result = plan.finish("".join(chunks))
+        yield self._section_event(section, index, result)
+
+    async def _ainvoke(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> str:
+        key = self._cache_key(section, prompt, inputs)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        deadline = current_deadline()
+        while True:
+            try:
+                # Budget first: a spent deadline must not leave an unawaited call behind
+                timeout = deadline.timeout() if deadline is not None else None
+                generate = self._async_in_flight.do("invoke:" + key, lambda members: self._agenerate(members, section, prompt, inputs, key),
+                                                    on_join=lambda: AGENT_COALESCED.inc(section=section), member=deadline)
+                # Only this caller stops waiting; the call runs on while others still wait for it
+                return await asyncio.wait_for(generate, timeout)
+            except DeadlineExceeded:
+                if deadline is None:
+                    raise
+                if not self._can_retry(deadline):
+                    return self._degrade(deadline, section)
+            except TimeoutError:
+                if deadline is None:
+                    raise
+                return self._degrade(deadline, section)
+
+    async def _agenerate(self, members: List[Any], section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any], key: str) -> str:
+        with SharedDeadline(members):
+            prompt_value = self._prompt_value(section, prompt, inputs)
+            llm = self._llm_for(section)
+            result = await self._acomplete(section, llm, prompt_value, inputs)
+            if self._escalates(section, llm, result):
+                result = await self._acomplete(section, self.llm, prompt_value, inputs)
+        self._remember(key, result)
+        return result
+
+    async def _acomplete(self, section: str, llm: Runnable, prompt_value: Any, inputs: Dict[str, Any]) -> str:
+        self._check_deadline()
+        MODEL_CALLS.inc(section=section, model=self._model_of(llm))
+        with AGENT_STAGE_LATENCY.time(section=section, stage="llm_wait"):
+            # No timeout of its own: the flight cancels the call once its last caller stops
+            # waiting, and cancelling closes its HTTP request, which stops the generation in Ollama
+            message = await llm.ainvoke(prompt_value, **self._generation_kwargs(section, llm, inputs))
+        return self._parse(section, message)
+
+    async def _astream(self, section: str, index: Optional[int], prompt: ChatPromptTemplate, inputs: Dict[str, Any],
+                       chunks: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        # Async generators can't return a value: the completion text is collected into `chunks`
+        key = self._cache_key(section, prompt, inputs)
+        cached = self._cached(key)
+        if cached is not None:
+            chunks.append(cached)
+            yield {"event": "token", "section": section, "index": index, "text": cached}
+            return
+
+        deadline = current_deadline()
+        while True:
+            chunk_stream = self._async_in_flight.stream("stream:" + key, lambda members: self._agenerate_stream(members, section, prompt, inputs, key),
+                                                        on_join=lambda: AGENT_COALESCED.inc(section=section), member=deadline)
+            try:
+                async for chunk in self._aiterate_within(deadline, chunk_stream) if deadline is not None else chunk_stream:
+                    if chunk is RESTART:
+                        chunks.clear()
+                        yield {"event": "reset", "section": section, "index": index}
+                        continue
+                    chunks.append(chunk)
+                    yield {"event": "token", "section": section, "index": index, "text": chunk}
+                return
+            except TimeoutError as e:
+                if deadline is None:
+                    raise
+                chunks.clear()
+                if isinstance(e, DeadlineExceeded) and self._can_retry(deadline):
+                    yield {"event": "reset", "section": section, "index": index}
+                    continue
+                yield {"event": "degraded", "section": section, "index": index}
+                self._degrade(deadline, section)
+                return
+
+    async def _agenerate_stream(self, members: List[Any], section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any],
+                                key: str) -> AsyncIterator[str]:
+        with SharedDeadline(members):
+            prompt_value = self._prompt_value(section, prompt, inputs)
+            llm = self._llm_for(section)
+            chunks = []
+            async for chunk in self._acomplete_stream(section, llm, prompt_value, inputs, chunks):
+                yield chunk
+            if self._escalates(section, llm, "".join(chunks)):
+                yield RESTART
+                chunks.clear()
+                async for chunk in self._acomplete_stream(section, self.llm, prompt_value, inputs, chunks):
+                    yield chunk
+        self._remember(key, "".join(chunks))
+
+    async def _acomplete_stream(self, section: str, llm: Runnable, prompt_value: Any, inputs: Dict[str, Any],
+                                chunks: List[str]) -> AsyncIterator[str]:
+        self._check_deadline()
+        MODEL_CALLS.inc(section=section, model=self._model_of(llm))
+        usage_message = None
+        parsing = 0.0
+        started = time.perf_counter()
+        async for message in llm.astream(prompt_value, **self._generation_kwargs(section, llm, inputs)):
+            if self._has_usage(message):
+                usage_message = message
+            parsed = time.perf_counter()
+            chunk = self.parser.invoke(message)
+            parsing += time.perf_counter() - parsed
+            chunks.append(chunk)
+            yield chunk
+        self._streamed(section, started, parsing, usage_message)
 
     #Helpers
+    def _summary_inputs(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": data.get("personalInfo", {}).get("name", "the candidate"),
+            "experience": self._summarize_experience(data.get("experience", [])),
+            "skills": ", ".join(data.get("skills", [])) or "general skills",
+            "education": self._summarize_education(data.get("education", [])),
+        }
+
+    def _experience_inputs(self, exp: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "job_title": exp.get("jobTitle", "Role"),
+            "company": exp.get("company", "Company"),
+            "duration": exp.get("duration", ""),
+            "basic_description": exp.get("description", "") or ""
+        }
+
+    def _project_inputs(self, proj: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "title": proj.get("title", ""),
+            "technologies": proj.get("technologies", "") or ""
+        }
+
+    def _finalize_summary(self, text: str) -> str:
+        with AGENT_STAGE_LATENCY.time(section="summary", stage="safety_net"):
+            result = text.strip()
+
+            # --- SAFETY NET ---
+            if self._is_unusable(result):
+                AGENT_FALLBACKS.inc(section="summary")
+                return "Motivated professional eager to contribute skills and grow within a dynamic organization."
+            return result
+
+    def _finalize_experience(self, text: str) -> str:
+        with AGENT_STAGE_LATENCY.time(section="experience", stage="safety_net"):
+            desc = text.strip()
+
+            # --- SAFETY NET ---
+            if self._is_unusable(desc):
+                AGENT_FALLBACKS.inc(section="experience")
+                desc = "- Assisted with daily tasks and supported team projects.\n- Contributed to assigned responsibilities.\n- Gained practical exposure in the role."
+            return desc
+
+    def _finalize_project(self, text: str, proj: Dict[str, Any]) -> str:
+        with AGENT_STAGE_LATENCY.time(section="projects", stage="safety_net"):
+            desc = text.strip()
+
+            # --- SAFETY NET ---
+            if self._is_unusable(desc):
+                AGENT_FALLBACKS.inc(section="projects")
+                desc = f"{proj.get('title', 'Project')} was developed to demonstrate practical application of technical skills."
+            return desc
+
+    def _categorize_skills(self, skills_list: List[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+        known, unknown = self.taxonomy.categorize(skills_list)
+        SKILLS_CATEGORIZED.inc(sum(len(group) for group in known.values()), source="taxonomy")
+        SKILLS_CATEGORIZED.inc(len(unknown), source="llm")
+        return known, unknown
+
+    def _parse_skills(self, text: str, skills_list: List[str],
+                      known: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+        """Parse the model's categories for skills_list and merge them after the locally known ones."""
+        organized_text = text.strip()
+        known = known or {}
+
+        # --- SAFETY NET ---
+        if self._is_unusable(organized_text):
+            AGENT_FALLBACKS.inc(section="skills")
+            if known:
+                # The user's real skills beat generic filler
+                return merge_categories(known, {"Skills": skills_list})
+            return {"Soft Skills": ["Communication", "Teamwork", "Adaptability"]}
+
+        skills_dict = {}
+        for line in organized_text.split("\n"):
+            if ":" in line:
+                category, skills = line.split(":", 1)
+                skills_dict[category.strip()] = [s.strip() for s in skills.split(",") if s.strip()]
+
+        return merge_categories(known, skills_dict if skills_dict else {"Skills": skills_list})
+
     def _summarize_experience(self, experience_list: List[Dict[str, Any]]) -> str:
         if not experience_list:
             return "No work experience provided"
@@ -167,3 +988,289 @@ class ResumeAIAgent:
             f"{edu.get('degree', '')} from {edu.get('institution', '')}"
             for edu in education_list if edu.get("degree") and edu.get("institution")
         )
+
+    def _map(self, fn: Callable[[Dict[str, Any]], Dict[str, Any]], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Order-preserving fan-out; single entries skip the pool hop
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        return [future.result() for future in [self._submit(fn, item) for item in items]]
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        # Pool threads don't inherit contextvars; carry the request's deadline and profile capture along
+        return self._executor.submit(contextvars.copy_context().run, profiling.run, fn, *args)
+
+    def _invoke(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> str:
+        key = self._cache_key(section, prompt, inputs)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        deadline = current_deadline()
+        if deadline is None:
+            return self._in_flight.do("invoke:" + key, lambda members: self._generate(section, prompt, inputs, key),
+                                      on_join=lambda: AGENT_COALESCED.inc(section=section))
+
+        # Under a deadline the completion is streamed: a call given up on is closed, which
+        # ends its Ollama request, instead of generating on in the background
+        while True:
+            chunks = []
+            try:
+                for chunk in self._iterate_within(deadline, self._follow(section, prompt, inputs, key, deadline)):
+                    if chunk is RESTART:
+                        chunks.clear()
+                        continue
+                    chunks.append(chunk)
+                return "".join(chunks)
+            except DeadlineExceeded:
+                if not self._can_retry(deadline):
+                    return self._degrade(deadline, section)
+
+    def _generate(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any], key: str) -> str:
+        prompt_value = self._prompt_value(section, prompt, inputs)
+        llm = self._llm_for(section)
+        result = self._complete(section, llm, prompt_value, inputs)
+        if self._escalates(section, llm, result):
+            result = self._complete(section, self.llm, prompt_value, inputs)
+        self._remember(key, result)
+        return result
+
+    def _complete(self, section: str, llm: Runnable, prompt_value: Any, inputs: Dict[str, Any]) -> str:
+        self._check_deadline()
+        MODEL_CALLS.inc(section=section, model=self._model_of(llm))
+        with AGENT_STAGE_LATENCY.time(section=section, stage="llm_wait"):
+            message = llm.invoke(prompt_value, **self._generation_kwargs(section, llm, inputs))
+        return self._parse(section, message)
+
+    def _stream(self, section: str, index: Optional[int], prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        # Yields token events and returns the full completion text
+        key = self._cache_key(section, prompt, inputs)
+        cached = self._cached(key)
+        if cached is not None:
+            yield {"event": "token", "section": section, "index": index, "text": cached}
+            return cached
+
+        deadline = current_deadline()
+        chunks = []
+        while True:
+            chunk_stream = self._follow(section, prompt, inputs, key, deadline)
+            try:
+                for chunk in self._iterate_within(deadline, chunk_stream) if deadline is not None else chunk_stream:
+                    if chunk is RESTART:
+                        # Escalated to the main model: clients drop the tokens shown so far
+                        chunks.clear()
+                        yield {"event": "reset", "section": section, "index": index}
+                        continue
+                    chunks.append(chunk)
+                    yield {"event": "token", "section": section, "index": index, "text": chunk}
+                return "".join(chunks)
+            except DeadlineExceeded:
+                if deadline is None:
+                    raise
+                chunks.clear()
+                if self._can_retry(deadline):
+                    yield {"event": "reset", "section": section, "index": index}
+                    continue
+                # Like "reset": clients drop the partial text; the section event brings the fallback
+                yield {"event": "degraded", "section": section, "index": index}
+                return self._degrade(deadline, section)
+
+    def _follow(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any], key: str, deadline: Any) -> Iterator[str]:
+        # Join (or start) the shared generation of this prompt as one of its callers
+        return self._in_flight.stream("stream:" + key, lambda members: self._generate_stream(members, section, prompt, inputs, key),
+                                      on_join=lambda: AGENT_COALESCED.inc(section=section), member=deadline)
+
+    def _generate_stream(self, members: List[Any], section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any],
+                         key: str) -> Iterator[str]:
+        # Runs in the flight's own thread, on the budget of whichever caller can wait longest
+        with SharedDeadline(members):
+            prompt_value = self._prompt_value(section, prompt, inputs)
+            llm = self._llm_for(section)
+            result = yield from self._complete_stream(section, llm, prompt_value, inputs)
+            if self._escalates(section, llm, result):
+                yield RESTART
+                result = yield from self._complete_stream(section, self.llm, prompt_value, inputs)
+        self._remember(key, result)
+
+    def _complete_stream(self, section: str, llm: Runnable, prompt_value: Any, inputs: Dict[str, Any]) -> Iterator[str]:
+        self._check_deadline()
+        MODEL_CALLS.inc(section=section, model=self._model_of(llm))
+        chunks = []
+        usage_message = None
+        parsing = 0.0
+        started = time.perf_counter()
+        for message in llm.stream(prompt_value, **self._generation_kwargs(section, llm, inputs)):
+            if self._has_usage(message):
+                usage_message = message
+            parsed = time.perf_counter()
+            chunk = self.parser.invoke(message)
+            parsing += time.perf_counter() - parsed
+            chunks.append(chunk)
+            yield chunk
+        self._streamed(section, started, parsing, usage_message)
+        return "".join(chunks)
+
+    # Shared by the sync and async calls above
+    def _cached(self, key: str) -> Optional[str]:
+        return self.cache.get(key) if self.cache is not None else None
+
+    def _remember(self, key: str, result: str) -> None:
+        # Never pin a refusal; the next click should get a fresh attempt
+        if self.cache is not None and not self._is_unusable(result.strip()):
+            self.cache.set(key, result)
+
+    def _prompt_value(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> Any:
+        with AGENT_STAGE_LATENCY.time(section=section, stage="prompt_build"):
+            return prompt.invoke(inputs)
+
+    def _escalates(self, section: str, llm: Runnable, result: str) -> bool:
+        # A routed model's output that fails validation is regenerated on the main model
+        if llm is self.llm or self._is_valid(section, result):
+            return False
+        AGENT_ESCALATIONS.inc(section=section, model=self._model_of(llm))
+        return True
+
+    def _parse(self, section: str, message: Any) -> str:
+        with AGENT_STAGE_LATENCY.time(section=section, stage="parse"):
+            result = self.parser.invoke(message)
+        record_usage(message, section)
+        return result
+
+    def _streamed(self, section: str, started: float, parsing: float, usage_message: Any) -> None:
+        # The same stages _complete() records: chunk parsing summed into "parse", the rest spent on the model
+        AGENT_STAGE_LATENCY.observe(time.perf_counter() - started - parsing, section=section, stage="llm_wait")
+        AGENT_STAGE_LATENCY.observe(parsing, section=section, stage="parse")
+        record_usage(usage_message, section)
+
+    def _has_usage(self, message: Any) -> bool:
+        # Ollama reports token counts on the final chunk
+        return bool(getattr(message, "usage_metadata", None) or getattr(message, "response_metadata", None))
+
+    #Deadlines
+    # Under a request deadline (deadline.py) every model call waits at most the remaining
+    # budget. Sections that run out get an empty completion, which their safety net turns
+    # into fallback text, and are listed in the deadline's `degraded`. A call shared by
+    # several requests runs on the longest of their budgets (SharedDeadline), while each
+    # request stops waiting at its own.
+
+    def _check_deadline(self) -> None:
+        # Don't start a model call the request can no longer wait for
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.timeout()
+
+    def _can_retry(self, deadline: Any) -> bool:
+        # A shared call can end with DeadlineExceeded on other callers' budgets; ours may still pay for a new one
+        return deadline.remaining() >= deadline.MIN_CALL_SECONDS
+
+    def _iterate_within(self, deadline: Any, iterator: Iterator[Any]) -> Iterator[Any]:
+        """Pull each chunk in the call pool, waiting at most the remaining budget for it."""
+        future = None
+        try:
+            while True:
+                timeout = deadline.timeout(minimum=0)
+                future = self._calls.submit(contextvars.copy_context().run, profiling.run, next, iterator, END)
+                if not wait([future], timeout=timeout).done:
+                    raise DeadlineExceeded(f"no chunk within {timeout:.1f}s")
+                chunk = future.result()
+                if chunk is END:
+                    return
+                yield chunk
+        finally:
+            # Closing the stream ends its HTTP request; wait for a pending chunk to land first
+            if future is not None:
+                future.add_done_callback(lambda _: iterator.close())
+            else:
+                iterator.close()
+
+    async def _aiterate_within(self, deadline: Any, iterator: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        try:
+            while True:
+                timeout = deadline.timeout(minimum=0)
+                try:
+                    chunk = await asyncio.wait_for(anext(iterator), timeout)
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            await iterator.aclose()
+
+    def _degrade(self, deadline: Any, section: str) -> str:
+        section = section.replace("_batch", "")
+        deadline.degrade(section)
+        AGENT_DEGRADED.inc(section=section)
+        return ""
+
+    def _degraded_sections(self) -> List[str]:
+        deadline = current_deadline()
+        return list(deadline.degraded) if deadline is not None else []
+
+    #Routing
+    def _llm_for(self, section: str) -> Runnable:
+        # Batched prompts follow their per-entry section
+        return self.section_llms.get(section) or self.section_llms.get(section.replace("_batch", "")) or self.llm
+
+    def _model_of(self, llm: Runnable) -> str:
+        return getattr(llm, "model", self.model_name)
+
+    def _is_valid(self, section: str, text: str) -> bool:
+        """Stricter than the safety nets: does this output follow its prompt closely enough to keep?"""
+        text = text.strip()
+        if self._is_unusable(text):
+            return False
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        bullets = [line for line in lines if line.startswith(("-", "•", "*"))]
+        if section == "experience":
+            return len(lines) == 3 and len(bullets) == 3
+        if section in ("summary", "projects"):
+            # A little slack over the prompt's "2–3" / "1–2" sentences
+            max_sentences = 4 if section == "summary" else 3
+            return not bullets and "?" not in text and len(SENTENCE_END.findall(text)) <= max_sentences
+        if section == "skills":
+            return any(":" in line for line in lines)
+        return True
+
+    def _prompt(self, section_template: str) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_messages([("system", SYSTEM_RULES), ("human", section_template)])
+
+    def _generation_kwargs(self, section: str, llm: Runnable, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        limits = self.generation_limits.get(section, {})
+        num_predict = limits.get("num_predict")
+        if num_predict and section.endswith("_batch"):
+            num_predict *= max(1, len(BATCH_MARKER.findall(inputs.get("entries", ""))))
+        # Passing options replaces ChatOllama's own, so the model's settings travel with them:
+        # agent defaults, then what the model was built with (a routed section model's
+        # temperature), then the section's limits
+        options = {"temperature": self.temperature, "num_ctx": self.num_ctx}
+        options.update(self._model_options(llm))
+        options.update((k, v) for k, v in (("num_predict", num_predict), ("stop", limits.get("stop"))) if v is not None)
+        return {"options": {k: v for k, v in options.items() if v is not None and v != []}}
+
+    def _model_options(self, llm: Runnable) -> Dict[str, Any]:
+        # An OllamaRouter's settings live on each host's ChatOllama, which all share them
+        endpoints = getattr(llm, "endpoints", None)
+        if endpoints:
+            llm = endpoints[0].llm
+        options = {name: getattr(llm, name, None) for name in MODEL_OPTIONS}
+        return {k: v for k, v in options.items() if v is not None}
+
+    def _cache_key(self, section: str, prompt: ChatPromptTemplate, inputs: Dict[str, Any]) -> str:
+        template = "".join(getattr(message, "prompt", message).template for message in prompt.messages)
+        # Routed sections are keyed on their first-choice model too
+        model = self.model_name
+        if section in self.section_llms or section.replace("_batch", "") in self.section_llms:
+            model = f"{model}|{self._model_of(self._llm_for(section))}"
+        # Generation limits (num_predict, stop, num_ctx) change the completion as much as the prompt does
+        options = self._generation_kwargs(section, self._llm_for(section), inputs)["options"]
+        return LLMCache.make_key(template, inputs, model, self.temperature, options)
+
+    def _split_batch(self, text: str) -> Dict[int, str]:
+        # Maps entry number -> block text from "=== ENTRY n ===" delimited output
+        blocks = {}
+        markers = list(BATCH_MARKER.finditer(text))
+        for marker, following in zip(markers, markers[1:] + [None]):
+            end = following.start() if following else len(text)
+            blocks[int(marker.group(1))] = text[marker.end():end].strip()
+        return blocks
+
+    def _is_unusable(self, text: str) -> bool:
+        return not text or "please provide" in text.lower() or "i don't have" in text.lower()
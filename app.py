@@ -1,64 +1,370 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context, g
 from flask_cors import CORS
 from datetime import datetime
+import hmac
 import io
 import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
 
 # Import your helpers
-from ai_agent import ResumeAIAgent
-from doc_generator import ResumeGenerator
+# Light modules only; langchain, reportlab and python-docx load on first use or during warm-up
+from deadline import Deadline
+from profiling import Capture
+from llm_cache import LLMCache
+from resume_model import ResumeValidationError, parse_resume, parse_section
+from skill_taxonomy import SkillTaxonomy, flatten as flatten_skills
+from metrics import REGISTRY, HTTP_ERRORS, HTTP_LATENCY, HTTP_REQUESTS
 
 app = Flask(__name__)
 CORS(app)
+# Key order carries meaning in some responses (skill categories)
+app.json.sort_keys = False
 
 # Initialize helpers
-ai_agent = ResumeAIAgent()
-pdf_generator = ResumeGenerator()
+llm_cache = LLMCache(
+    max_entries=int(os.environ.get("RESUME_AI_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.environ.get("RESUME_AI_CACHE_TTL", "3600")),
+    db_path=os.environ.get("RESUME_AI_CACHE_DB") or None,
+    max_disk_entries=int(os.environ.get("RESUME_AI_CACHE_DB_SIZE", "10000")),
+)
+
+_services = {}
+_services_lock = threading.Lock()
+_readiness = {"ready": False, "started": None, "finished": None, "steps": {}}
+
+
+def _service(name, build):
+    service = _services.get(name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(name)
+            if service is None:
+                service = _services[name] = build()
+    return service
+
+
+def get_agent():
+    return _service("agent", _build_agent)
+
+
+def get_generator():
+    return _service("generator", _build_generator)
+
+
+def get_job_queue():
+    return _service("jobs", _build_job_queue)
+
+
+def get_bulk_pool():
+    return _service("bulk", _build_bulk_pool)
+
+
+def _build_agent():
+    from ai_agent import ResumeAIAgent
+    from llm_backend import FakeLLM, OllamaRouter
+
+    deterministic = os.environ.get("RESUME_AI_DETERMINISTIC", "0") == "1"
+    temperature = 0.0 if deterministic else 0.7
+    keep_alive = os.environ.get("RESUME_AI_KEEP_ALIVE", "30m")
+    ollama_hosts = [h.strip() for h in os.environ.get("RESUME_AI_OLLAMA_HOSTS", "").split(",") if h.strip()]
+    fake = os.environ.get("RESUME_AI_FAKE_LLM", "0") == "1"
+
+    def make_backend(model):
+        if fake:
+            return FakeLLM(model=model)
+        if ollama_hosts:
+            return OllamaRouter(
+                ollama_hosts,
+                model=model,
+                temperature=temperature,
+                routing=os.environ.get("RESUME_AI_ROUTING", "least_outstanding"),
+                pool_size=int(os.environ.get("RESUME_AI_POOL_SIZE", "8")),
+                keep_alive=keep_alive,
+            )
+        from langchain_ollama import ChatOllama
+        return ChatOllama(model=model, temperature=temperature, keep_alive=keep_alive)
+
+    if fake:
+        llm_backend = FakeLLM()
+    elif ollama_hosts:
+        llm_backend = make_backend("llama3.2")
+    else:
+        # Single default local Ollama, as before
+        llm_backend = None
+
+    # e.g. "projects=llama3.2:1b,experience=llama3.2:1b"; one backend per distinct model
+    section_llms, backends = {}, {}
+    for pair in os.environ.get("RESUME_AI_SECTION_MODELS", "").split(","):
+        section, _, model = pair.partition("=")
+        if section.strip() and model.strip():
+            model = model.strip()
+            backends.setdefault(model, make_backend(model))
+            section_llms[section.strip()] = backends[model]
+
+    return ResumeAIAgent(
+        max_concurrency=int(os.environ.get("RESUME_AI_MAX_CONCURRENCY", "4")),
+        batch_entries=os.environ.get("RESUME_AI_BATCH_ENTRIES", "0") == "1",
+        cache=llm_cache,
+        deterministic=deterministic,
+        llm=llm_backend,
+        keep_alive=keep_alive,
+        num_ctx=int(os.environ.get("RESUME_AI_NUM_CTX", "4096")),
+        # Extra known skills on top of the built-in taxonomy
+        taxonomy=SkillTaxonomy.from_json(os.environ["RESUME_SKILL_TAXONOMY"]) if os.environ.get("RESUME_SKILL_TAXONOMY") else None,
+        section_llms=section_llms,
+    )
+
+
+def _build_generator():
+    from doc_generator import ResumeGenerator
+
+    return ResumeGenerator(
+        cache_size=int(os.environ.get("RESUME_RENDER_CACHE_SIZE", "128")),
+        template_modules=[m.strip() for m in os.environ.get("RESUME_TEMPLATE_MODULES", "").split(",") if m.strip()],
+        # Set when running several workers so /api/preview/<key>.pdf works on any of them
+        spool_dir=os.environ.get("RESUME_RENDER_SPOOL") or None,
+    )
+
+
+def _build_job_queue():
+    from job_queue import JobQueue
+
+    jobs = JobQueue(
+        run_ai_resume_job,
+        db_path=os.environ.get("RESUME_JOBS_DB", "resume_jobs.db"),
+        workers=int(os.environ.get("RESUME_JOBS_WORKERS", "2")),
+        max_pending=int(os.environ.get("RESUME_JOBS_MAX_PENDING", "100")),
+    )
+    # Pick up work queued or abandoned before the last restart
+    jobs.recover()
+    return jobs
+
+
+# At most one render process per CPU, shared by every bulk request of this server process
+BULK_MAX_PROCESSES = os.cpu_count() or 1
+BULK_PROCESSES = min(max(1, int(os.environ.get("RESUME_BULK_PROCESSES", str(BULK_MAX_PROCESSES)))), BULK_MAX_PROCESSES)
+
+
+def _build_bulk_pool():
+    from bulk_render import make_pool
+
+    return make_pool(
+        BULK_PROCESSES,
+        template_modules=[m.strip() for m in os.environ.get("RESUME_TEMPLATE_MODULES", "").split(",") if m.strip()],
+    )
+
+
+# --- Warm-up ---
+def warm_up():
+    """
+    Import the heavy modules, pre-render every template once and ask Ollama to
+    load the model. The LLM step is reported but does not gate readiness, so an
+    Ollama outage doesn't take PDF rendering out of rotation.
+    """
+    _readiness["started"] = datetime.now().isoformat()
+    steps = _readiness["steps"]
+    for name, step, required in (
+        ("generator", lambda: get_generator().warm_up(), True),
+        ("agent", get_agent, True),
+        ("llm", lambda: get_agent().warm_up(), False),
+        ("jobs", get_job_queue, False),
+    ):
+        started = time.perf_counter()
+        try:
+            step()
+            steps[name] = {"status": "ok", "seconds": round(time.perf_counter() - started, 3)}
+        except Exception as e:
+            steps[name] = {"status": "failed", "error": str(e), "seconds": round(time.perf_counter() - started, 3)}
+            if required:
+                break
+    _readiness["finished"] = datetime.now().isoformat()
+    _readiness["ready"] = all(steps.get(name, {}).get("status") == "ok" for name in ("generator", "agent"))
+
+
+def start_warm_up():
+    threading.Thread(target=warm_up, name="resume-warm-up", daemon=True).start()
+
+
+# Spawned bulk-render workers re-import this module as __mp_main__; they have nothing to warm up
+if os.environ.get("RESUME_WARMUP", "1") == "1" and __name__ != "__mp_main__":
+    start_warm_up()
+
+# --- Request Metrics ---
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    if response.status_code >= 500:
+        HTTP_ERRORS.inc(endpoint=endpoint)
+    HTTP_LATENCY.observe(time.perf_counter() - g.get("request_started", time.perf_counter()), endpoint=endpoint)
+    return response
+
+
+# --- Profiling ---
+# Opt-in cProfile + tracemalloc capture of single requests, written to PROFILE_DIR/<request id>/.
+# Triggered by an X-Profile header matching RESUME_PROFILE_TOKEN (ignored while no token
+# is set) or by sampling a fraction of requests; X-Profile-Id in the response names the capture.
+PROFILE_DIR = os.environ.get("RESUME_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "resume-profiles")
+PROFILE_TOKEN = os.environ.get("RESUME_PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.environ.get("RESUME_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_KEEP = int(os.environ.get("RESUME_PROFILE_KEEP", "200"))
+
+
+def profile_capture(headers):
+    """A Capture for this request if it asked for one or was sampled, else None."""
+    header = headers.get("X-Profile")
+    if header and PROFILE_TOKEN and hmac.compare_digest(header.encode("utf-8"), PROFILE_TOKEN.encode("utf-8")):
+        trigger = "header"
+    elif PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        trigger = "sampled"
+    else:
+        return None
+    return Capture(headers.get("X-Request-ID") or uuid.uuid4().hex, PROFILE_DIR, trigger, keep=PROFILE_KEEP)
+
+
+def finish_profile(capture, method, path, status):
+    # Profiling is diagnostic only: a failed write is logged, never allowed to fail the request it describes
+    try:
+        capture.finish(method=method, path=path, status=status)
+    except Exception as e:
+        app.logger.warning("Profile capture %s could not be written: %s", capture.request_id, e)
+
+
+@app.before_request
+def start_profile():
+    capture = profile_capture(request.headers)
+    if capture is not None:
+        g.profile = capture.start()
+
+
+@app.after_request
+def attach_profile(response):
+    capture = g.pop("profile", None)
+    if capture is not None:
+        response.headers["X-Profile-Id"] = capture.request_id
+        # Streamed bodies are produced after this hook; stop once the server has sent them
+        method, path, status = request.method, request.path, response.status_code
+        # Passthrough bodies (send_file) bypass the close callbacks
+        response.direct_passthrough = False
+        response.call_on_close(lambda: finish_profile(capture, method, path, status))
+    return response
+
+
+@app.teardown_request
+def abandon_profile(error=None):
+    # Unhandled errors skip after_request
+    capture = g.pop("profile", None)
+    if capture is not None:
+        finish_profile(capture, request.method, request.path, 500)
+
+
+# --- Request Validation ---
+def request_body():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ResumeValidationError(["request body must be a JSON object"])
+    return body
+
+
+@app.errorhandler(ResumeValidationError)
+def invalid_request(e):
+    return jsonify({"success": False, "error": str(e), "errors": e.errors}), 400
+
+
+# --- Request Deadlines ---
+# Budget for one request's model calls. Sections that can't finish in time get their
+# safety-net text and are listed under "degraded" instead of failing the request.
+DEFAULT_DEADLINE = float(os.environ.get("RESUME_AI_DEADLINE", "60"))
+MAX_DEADLINE = 600
+
+
+def request_deadline(headers):
+    """X-Request-Timeout (seconds) if sent, else RESUME_AI_DEADLINE; 0 there means no limit."""
+    value = headers.get("X-Request-Timeout")
+    if value is None:
+        return Deadline(DEFAULT_DEADLINE or None)
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0.0
+    if not 0 < seconds <= MAX_DEADLINE:
+        raise ResumeValidationError([f"X-Request-Timeout must be a number of seconds above 0 and at most {MAX_DEADLINE}"])
+    return Deadline(seconds)
+
 
 # --- Enhancement Endpoints ---
 @app.route("/api/enhance-summary", methods=["POST"])
 def enhance_summary():
+    data = parse_resume(request_body(), "body").to_dict()
+    deadline = request_deadline(request.headers)
     try:
-        data = request.json
-        enhanced = ai_agent.enhance_summary(data)
-        return jsonify({"success": True, "summary": enhanced})
+        with deadline:
+            enhanced = get_agent().enhance_summary(data)
+        return jsonify({"success": True, "summary": enhanced, "degraded": deadline.degraded})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def previous_section(request_data, section):
+    """An earlier enhance-<section> response echoed back as "previous"."""
+    previous = request_data.get("previous")
+    if not isinstance(previous, dict):
+        return None
+    return {section: parse_section(previous, section), "fingerprints": previous.get("fingerprints")}
+
+
 @app.route("/api/enhance-experience", methods=["POST"])
 def enhance_experience():
+    request_data = request_body()
+    experience = parse_section(request_data, "experience")
+    previous = previous_section(request_data, "experience")
+    deadline = request_deadline(request.headers)
     try:
-        data = request.json
-        enhanced = ai_agent.enhance_experience(data.get("experience", []))
-        return jsonify({"success": True, "experience": enhanced})
+        agent = get_agent()
+        with deadline:
+            # Fingerprint before enhancing; entries are updated in place
+            inputs = agent.entry_fingerprints("experience", experience)
+            enhanced = agent.enhance_experience(experience, previous=previous)
+            fingerprints = agent.pair_fingerprints("experience", inputs, enhanced)
+        return jsonify({"success": True, "experience": enhanced, "fingerprints": fingerprints, "degraded": deadline.degraded})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route("/api/enhance-skills", methods=["POST"])
 def enhance_skills():
+    skills = parse_section(request_body(), "skills")
+    deadline = request_deadline(request.headers)
     try:
-        data = request.json
-        organized = ai_agent.organize_skills(data.get("skills", []))
-        all_skills = []
-        for cat, skills in organized.items():
-            all_skills.extend(skills)
-        return jsonify({"success": True, "skills": list(set(all_skills))})
+        with deadline:
+            organized = get_agent().organize_skills(skills)
+        # Ordered and already deduped; the categories ride along for clients that show them
+        return jsonify({"success": True, "skills": flatten_skills(organized), "skillCategories": organized,
+                        "degraded": deadline.degraded})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route("/api/enhance-education", methods=["POST"])
 def enhance_education():
+    education = parse_section(request_body(), "education")
     try:
-        data = request.json
         enhanced = []
-        for edu in data.get("education", []):
+        for edu in education:
             enhanced.append({
-                "degree": edu.get("degree", "Diploma / Degree"),
-                "institution": edu.get("institution", "Institute Name"),
-                "year": edu.get("year", "Year"),
+                "degree": edu["degree"] or "Diploma / Degree",
+                "institution": edu["institution"] or "Institute Name",
+                "year": edu["year"] or "Year",
             })
         return jsonify({"success": True, "education": enhanced})
     except Exception as e:
@@ -67,108 +373,373 @@ def enhance_education():
 
 @app.route("/api/enhance-projects", methods=["POST"])
 def enhance_projects():
+    request_data = request_body()
+    projects = parse_section(request_data, "projects")
+    previous = previous_section(request_data, "projects")
+    deadline = request_deadline(request.headers)
     try:
-        data = request.json
-        enhanced = ai_agent.enhance_projects(data.get("projects", []))
-        return jsonify({"success": True, "projects": enhanced})
+        agent = get_agent()
+        with deadline:
+            inputs = agent.entry_fingerprints("projects", projects)
+            enhanced = agent.enhance_projects(projects, previous=previous)
+            fingerprints = agent.pair_fingerprints("projects", inputs, enhanced)
+        return jsonify({"success": True, "projects": enhanced, "fingerprints": fingerprints, "degraded": deadline.degraded})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+# --- Streaming Enhancement Endpoints (Server-Sent Events) ---
+def sse_response(events):
+    def generate():
+        try:
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/enhance-summary/stream", methods=["POST"])
+def enhance_summary_stream():
+    data = parse_resume(request_body(), "body").to_dict()
+    return sse_response(request_deadline(request.headers).iterate(get_agent().stream_summary(data)))
+
+
+@app.route("/api/enhance-experience/stream", methods=["POST"])
+def enhance_experience_stream():
+    experience = parse_section(request_body(), "experience")
+    return sse_response(request_deadline(request.headers).iterate(get_agent().stream_experience(experience)))
+
+
+@app.route("/api/enhance-skills/stream", methods=["POST"])
+def enhance_skills_stream():
+    skills = parse_section(request_body(), "skills")
+    return sse_response(request_deadline(request.headers).iterate(get_agent().stream_skills(skills)))
+
+
+@app.route("/api/enhance-projects/stream", methods=["POST"])
+def enhance_projects_stream():
+    projects = parse_section(request_body(), "projects")
+    return sse_response(request_deadline(request.headers).iterate(get_agent().stream_projects(projects)))
+
+
+@app.route("/api/generate-ai-resume/stream", methods=["POST"])
+def generate_ai_resume_stream():
+    request_data = request_body()
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    template = request_data.get("template", "Minimal")
+    deadline = request_deadline(request.headers)
+
+    def events():
+        for event in get_agent().stream_resume(data):
+            if event["event"] == "done":
+                enhanced = event["result"]
+                apply_enhancement(data, enhanced)
+                event = {"event": "done", "success": True, "template": template, "data": data, "skillCategories": enhanced["skills"],
+                         "degraded": enhanced["degraded"]}
+            yield event
+
+    return sse_response(deadline.iterate(events()))
+
+
 # --- RAW GENERATE (NO AI, PREVIEW ONLY) ---
 @app.route("/generate-resume", methods=["POST"])
 def generate_resume():
+    request_data = request_body()
+    data = parse_resume(request_data.get("data", {})).to_dict()
     try:
-        request_data = request.json
-        data = request_data.get("data", {})
         template = request_data.get("template", "Minimal")
 
-        if isinstance(data, str):
-            data = json.loads(data)
-
         # Return JSON preview instead of file
         return jsonify({"success": True, "template": template, "resumeData": data})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def apply_enhancement(data, enhanced):
+    data["summary"] = enhanced["summary"]
+    data["experience"] = enhanced["experience"]
+    data["skills"] = flatten_skills(enhanced["skills"])
+    data["projects"] = enhanced["projects"]
+
+
+def enhancement_response(template, data, enhanced):
+    apply_enhancement(data, enhanced)
+    # Send this whole object back as "previous" to only re-run what changed
+    return {
+        "success": True,
+        "template": template,
+        "data": data,
+        "skillCategories": enhanced["skills"],
+        "fingerprints": enhanced["fingerprints"],
+        "degraded": enhanced["degraded"],
+    }
+
+
+def previous_result(request_data):
+    """An earlier generate-ai-resume response echoed back as "previous", reshaped for enhance_resume()."""
+    previous = request_data.get("previous")
+    if not isinstance(previous, dict):
+        return None
+    data = parse_resume(previous.get("data", {}), "previous.data").to_dict()
+    categories = previous.get("skillCategories")
+    if not (isinstance(categories, dict) and all(isinstance(v, list) for v in categories.values())):
+        categories = None
+    return {
+        "summary": data["summary"],
+        "experience": data["experience"],
+        "projects": data["projects"],
+        "skills": categories,
+        "fingerprints": previous.get("fingerprints"),
+    }
+
+
 # --- AI ENHANCED GENERATE (PREVIEW ONLY) ---
 @app.route("/api/generate-ai-resume", methods=["POST"])
 def generate_ai_resume():
+    # Reject malformed payloads before they reach the GPU queue
+    request_data = request_body()
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    previous = previous_result(request_data)
+    deadline = request_deadline(request.headers)
     try:
-        request_data = request.json
-        data = request_data.get("data", {})
         template = request_data.get("template", "Minimal")
 
-        if isinstance(data, str):
-            data = json.loads(data)
-
-        # Enhance each section
-        data["summary"] = ai_agent.enhance_summary(data)
-        data["experience"] = ai_agent.enhance_experience(data.get("experience", []))
-        data["skills"] = list(set(sum(ai_agent.organize_skills(data.get("skills", [])).values(), [])))
-        data["projects"] = ai_agent.enhance_projects(data.get("projects", []))
-
-        return jsonify({"success": True, "template": template, "data": data})
+        # Enhance all sections concurrently, skipping whatever is unchanged since `previous`;
+        # whatever misses the deadline comes back as safety-net text, listed in "degraded"
+        with deadline:
+            enhanced = get_agent().enhance_resume(data, previous=previous)
+        return jsonify(enhancement_response(template, data, enhanced))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# --- AI ENHANCED GENERATE (JOB MODE) ---
+# Submit returns at once; a bounded job pool runs the agent and clients poll for progress
+def run_ai_resume_job(payload, report):
+    data = payload["data"]
+    progress = {
+        "summary": {"done": 0, "total": 1},
+        "skills": {"done": 0, "total": 1},
+        "experience": {"done": 0, "total": len(data["experience"])},
+        "projects": {"done": 0, "total": len(data["projects"])},
+    }
+    lock = threading.Lock()
+
+    def on_section(section, index):
+        with lock:
+            counts = progress[section]
+            # A batched section finishes all of its entries at once
+            counts["done"] = counts["total"] if index is None else counts["done"] + 1
+            report(progress)
+
+    enhanced = get_agent().enhance_resume(data, on_section=on_section, previous=payload.get("previous"))
+    return enhancement_response(payload["template"], data, enhanced)
+
+
+@app.route("/api/jobs/generate-ai-resume", methods=["POST"])
+def submit_ai_resume_job():
+    from job_queue import JobQueueFull
+
+    request_data = request_body()
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    try:
+        job_id = get_job_queue().submit({
+            "data": data,
+            "template": request_data.get("template", "Minimal"),
+            "previous": previous_result(request_data),
+        })
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "30"
+        return response, 503
+    return jsonify({"jobId": job_id, "status": "queued", "statusUrl": f"/api/jobs/{job_id}"}), 202
+
+
+# ?since=<version>&wait=<seconds> long-polls until the job changes; without wait it returns at once
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    since = request.args.get("since", -1, type=int)
+    wait = min(max(request.args.get("wait", 0, type=float), 0), 30)
+    job = get_job_queue().wait(job_id, since, wait) if wait else get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/jobs", methods=["GET"])
+def job_stats():
+    return jsonify(get_job_queue().stats())
+
+
 # --- DOWNLOAD RESUME (PDF/DOCX) ---
+MAX_FIT_PAGES = 5
+
+
+def fit_pages_option(request_data):
+    """Optional "fitPages": shrink the PDF's spacing and type until it fits that many pages."""
+    fit_pages = request_data.get("fitPages")
+    if fit_pages is None:
+        return None
+    if isinstance(fit_pages, bool) or not isinstance(fit_pages, int) or not 1 <= fit_pages <= MAX_FIT_PAGES:
+        raise ResumeValidationError([f"fitPages must be an integer from 1 to {MAX_FIT_PAGES}"])
+    return fit_pages
+
+
 @app.route("/download-resume", methods=["POST"])
 def download_resume():
+    request_data = request_body()
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    file_format = str(request_data.get("format", "pdf")).lower()
+    if file_format not in ("pdf", "docx"):
+        return jsonify({"error": "Unsupported format"}), 400
+    # DOCX pagination is up to the word processor
+    fit_pages = fit_pages_option(request_data) if file_format == "pdf" else None
+
     try:
-        request_data = request.json
-        data = request_data.get("data", {})
         template = request_data.get("template", "Minimal")
-        file_format = request_data.get("format", "pdf").lower()
 
         # Extract candidate name (default fallback)
-        personal_info = data.get("personalInfo", {})
-        candidate_name = personal_info.get("name", "User").replace(" ", "-")
+        candidate_name = (data["personalInfo"]["name"] or "User").replace(" ", "-")
         filename = f"{candidate_name}-Resume.{file_format}"
 
+        # Unchanged resume: let the client reuse its copy without re-rendering
+        etag = get_generator().document_key(data, template, file_format, fit_pages)
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
         if file_format == "pdf":
-            buffer = pdf_generator.generate_pdf(data, template)
+            buffer = get_generator().generate_pdf(data, template, fit_pages)
             return send_file(
                 buffer,
                 mimetype="application/pdf",
                 as_attachment=True,
-                download_name=filename
+                download_name=filename,
+                etag=etag
             )
 
-        elif file_format == "docx":
-            buffer = pdf_generator.generate_docx(data, template)
+        else:
+            buffer = get_generator().generate_docx(data, template)
             return send_file(
                 buffer,
                 mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                 as_attachment=True,
-                download_name=filename
+                download_name=filename,
+                etag=etag
             )
 
-        else:
-            return jsonify({"error": "Unsupported format"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
+# --- PREVIEW (RENDER ONCE, SERVE BY URL) ---
+# Clients point an iframe at the returned URL instead of inlining base64 PDF bytes
+@app.route("/api/preview", methods=["POST"])
+def create_preview():
+    request_data = request_body()
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    template = request_data.get("template", "Minimal")
+    fit_pages = fit_pages_option(request_data)
+    try:
+        key = get_generator().document_key(data, template, "pdf", fit_pages)
+        get_generator().generate_pdf(data, template, fit_pages)
+        return jsonify({"key": key, "url": f"/api/preview/{key}.pdf"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@app.route("/api/preview/<key>.pdf", methods=["GET"])
+def get_preview(key):
+    pdf_bytes = get_generator().rendered(key)
+    if pdf_bytes is None:
+        return jsonify({"error": "Preview expired; POST /api/preview again"}), 404
+    response = send_file(io.BytesIO(pdf_bytes), mimetype="application/pdf", etag=key)
+    # Content-addressed over the resume, options and renderer version: the bytes behind a key never change
+    response.headers["Cache-Control"] = "private, max-age=3600, immutable"
+    return response
+
+
+# --- BULK RENDER (JSONL IN, ZIP OUT) ---
+@app.route("/api/bulk-render", methods=["POST"])
+def bulk_render():
+    from bulk_render import render_jsonl, write_zip
+
+    value = request.args.get("processes", str(BULK_PROCESSES))
+    processes = int(value) if value.isdigit() else 0
+    if not 1 <= processes <= BULK_MAX_PROCESSES:
+        raise ResumeValidationError([f"processes must be a whole number from 1 to {BULK_MAX_PROCESSES}"])
+
+    try:
+        lines = request.get_data(as_text=True).splitlines()
+
+        # Spills to disk past 32 MB so large batches don't pin worker memory
+        archive = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+        rendered, failed = write_zip(render_jsonl(lines, processes, pool=get_bulk_pool()), archive)
+        archive.seek(0)
+
+        response = send_file(archive, mimetype="application/zip", as_attachment=True, download_name="resumes.zip")
+        response.headers["X-Rendered-Count"] = str(rendered)
+        response.headers["X-Failed-Count"] = str(failed)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/templates", methods=["GET"])
+def list_templates():
+    return jsonify({"templates": get_generator().templates()})
+
+
 # --- Health/Test Endpoints ---
+# Liveness: the process answers; never touches the agent or renderers
 @app.route("/api/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
 
+# Readiness: warm-up finished, safe to route user traffic here
+@app.route("/api/ready", methods=["GET"])
+def readiness_check():
+    return jsonify(_readiness), 200 if _readiness["ready"] else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/cache-stats", methods=["GET"])
+def cache_stats():
+    return jsonify(llm_cache.stats())
+
+
+@app.route("/api/llm-backends", methods=["GET"])
+def llm_backends():
+    agent = get_agent()
+    stats = agent.llm.stats() if hasattr(agent.llm, "stats") else []
+    section_models = {section: getattr(llm, "model", None) for section, llm in agent.section_llms.items()}
+    return jsonify({"model": agent.model_name, "sectionModels": section_models, "endpoints": stats})
+
+
 @app.route("/api/test", methods=["POST"])
 def test_ai():
     try:
         data = request.json
         msg = data.get("message", "Hello AI")
-        result = ai_agent.test_message(msg)
+        result = get_agent().test_message(msg)
         return jsonify({"input": msg, "output": result})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 if __name__ == "__main__":
+    # Development server; for async serving and multiple workers see asgi.py and gunicorn.conf.py
     print("Starting Resume Builder AI Agent Server...")
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -0,0 +1,290 @@
+"""
+ASGI server: the same API as app.py, with the LLM-bound routes as coroutines.
+
+Enhancement and streaming routes await ResumeAIAgent's async methods (ChatOllama
+ainvoke/astream), so one event loop keeps hundreds of requests waiting on Ollama
+without a thread each. PDF/DOCX rendering is CPU-bound and runs in a thread pool
+off the loop. Every other route (jobs, metrics, health, templates, bulk render,
+preview GET, ...) is app.py's Flask view, mounted as WSGI.
+
+    uvicorn asgi:app --port 5000               # development, one worker
+    gunicorn -c gunicorn.conf.py asgi:app      # production, several workers
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import (app as flask_app, get_agent, get_generator, apply_enhancement, enhancement_response,
+                 fit_pages_option, previous_result, previous_section, request_deadline,
+                 profile_capture, finish_profile)
+import profiling
+from metrics import HTTP_ERRORS, HTTP_LATENCY, HTTP_REQUESTS
+from resume_model import ResumeValidationError, parse_resume, parse_section
+from skill_taxonomy import flatten as flatten_skills
+
+
+# ReportLab holds the GIL while laying out, so this pool keeps renders off the event
+# loop rather than running them in parallel; worker processes add the parallelism
+render_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("RESUME_RENDER_THREADS", "4")),
+                                     thread_name_prefix="resume-render")
+
+
+# --- Request Handling ---
+async def request_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        raise ResumeValidationError(["request body must be a JSON object"])
+    return body
+
+
+def route(path, endpoint, methods=("POST",)):
+    """Route with the same validation errors and HTTP metrics as app.py's Flask hooks."""
+    async def handle(request):
+        started = time.perf_counter()
+        capture = profile_capture(request.headers)
+        if capture is not None:
+            capture.start()
+        try:
+            response = await endpoint(request)
+        except ResumeValidationError as e:
+            response = JSONResponse({"success": False, "error": str(e), "errors": e.errors}, 400)
+        except Exception:
+            HTTP_REQUESTS.inc(endpoint=path, method=request.method, status=500)
+            HTTP_ERRORS.inc(endpoint=path)
+            if capture is not None:
+                finish_profile(capture, request.method, request.url.path, 500)
+            raise
+        if capture is not None:
+            # Runs on this loop thread once the (possibly streamed) body has been sent
+            response.headers["X-Profile-Id"] = capture.request_id
+            response.background = BackgroundTask(finish_async_profile, capture, request.method, request.url.path, response.status_code)
+        HTTP_REQUESTS.inc(endpoint=path, method=request.method, status=response.status_code)
+        if response.status_code >= 500:
+            HTTP_ERRORS.inc(endpoint=path)
+        HTTP_LATENCY.observe(time.perf_counter() - started, endpoint=path)
+        return response
+
+    return Route(path, handle, methods=list(methods))
+
+
+async def finish_async_profile(capture, method, path, status):
+    # The loop thread's profiler has to be stopped from the loop thread; writing the files can wait in a worker
+    capture.stop()
+    await run_in_threadpool(finish_profile, capture, method, path, status)
+
+
+async def render(fn, *args):
+    # run_in_executor doesn't copy contextvars; the render joins the request's profile capture
+    job = functools.partial(contextvars.copy_context().run, profiling.run, fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(render_executor, job)
+
+
+# --- Enhancement Endpoints ---
+async def enhance_summary(request):
+    data = parse_resume(await request_body(request), "body").to_dict()
+    deadline = request_deadline(request.headers)
+    try:
+        with deadline:
+            enhanced = await get_agent().aenhance_summary(data)
+        return JSONResponse({"success": True, "summary": enhanced, "degraded": deadline.degraded})
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)}, 500)
+
+
+async def enhance_experience(request):
+    request_data = await request_body(request)
+    experience = parse_section(request_data, "experience")
+    previous = previous_section(request_data, "experience")
+    deadline = request_deadline(request.headers)
+    try:
+        agent = get_agent()
+        with deadline:
+            inputs = agent.entry_fingerprints("experience", experience)
+            enhanced = await agent.aenhance_experience(experience, previous=previous)
+            fingerprints = agent.pair_fingerprints("experience", inputs, enhanced)
+        return JSONResponse({"success": True, "experience": enhanced, "fingerprints": fingerprints, "degraded": deadline.degraded})
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)}, 500)
+
+
+async def enhance_skills(request):
+    skills = parse_section(await request_body(request), "skills")
+    deadline = request_deadline(request.headers)
+    try:
+        with deadline:
+            organized = await get_agent().aorganize_skills(skills)
+        return JSONResponse({"success": True, "skills": flatten_skills(organized), "skillCategories": organized,
+                             "degraded": deadline.degraded})
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)}, 500)
+
+
+async def enhance_projects(request):
+    request_data = await request_body(request)
+    projects = parse_section(request_data, "projects")
+    previous = previous_section(request_data, "projects")
+    deadline = request_deadline(request.headers)
+    try:
+        agent = get_agent()
+        with deadline:
+            inputs = agent.entry_fingerprints("projects", projects)
+            enhanced = await agent.aenhance_projects(projects, previous=previous)
+            fingerprints = agent.pair_fingerprints("projects", inputs, enhanced)
+        return JSONResponse({"success": True, "projects": enhanced, "fingerprints": fingerprints, "degraded": deadline.degraded})
+    except Exception as e:
+        return JSONResponse({"success": False, "error": str(e)}, 500)
+
+
+async def generate_ai_resume(request):
+    request_data = await request_body(request)
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    previous = previous_result(request_data)
+    deadline = request_deadline(request.headers)
+    try:
+        template = request_data.get("template", "Minimal")
+        with deadline:
+            enhanced = await get_agent().aenhance_resume(data, previous=previous)
+        return JSONResponse(enhancement_response(template, data, enhanced))
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+# --- Streaming Enhancement Endpoints (Server-Sent Events) ---
+def sse_response(events):
+    async def generate():
+        try:
+            async for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(generate(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def enhance_summary_stream(request):
+    data = parse_resume(await request_body(request), "body").to_dict()
+    return sse_response(request_deadline(request.headers).aiterate(get_agent().astream_summary(data)))
+
+
+async def enhance_experience_stream(request):
+    experience = parse_section(await request_body(request), "experience")
+    return sse_response(request_deadline(request.headers).aiterate(get_agent().astream_experience(experience)))
+
+
+async def enhance_skills_stream(request):
+    skills = parse_section(await request_body(request), "skills")
+    return sse_response(request_deadline(request.headers).aiterate(get_agent().astream_skills(skills)))
+
+
+async def enhance_projects_stream(request):
+    projects = parse_section(await request_body(request), "projects")
+    return sse_response(request_deadline(request.headers).aiterate(get_agent().astream_projects(projects)))
+
+
+async def generate_ai_resume_stream(request):
+    request_data = await request_body(request)
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    template = request_data.get("template", "Minimal")
+    deadline = request_deadline(request.headers)
+
+    async def events():
+        async for event in get_agent().astream_resume(data):
+            if event["event"] == "done":
+                enhanced = event["result"]
+                apply_enhancement(data, enhanced)
+                event = {"event": "done", "success": True, "template": template, "data": data, "skillCategories": enhanced["skills"],
+                         "degraded": enhanced["degraded"]}
+            yield event
+
+    return sse_response(deadline.aiterate(events()))
+
+
+# --- DOWNLOAD RESUME (PDF/DOCX) ---
+def etag_matches(header, etag):
+    tags = [tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def download_resume(request):
+    request_data = await request_body(request)
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    file_format = str(request_data.get("format", "pdf")).lower()
+    if file_format not in ("pdf", "docx"):
+        return JSONResponse({"error": "Unsupported format"}, 400)
+    fit_pages = fit_pages_option(request_data) if file_format == "pdf" else None
+
+    try:
+        template = request_data.get("template", "Minimal")
+        candidate_name = (data["personalInfo"]["name"] or "User").replace(" ", "-")
+        filename = quote(f"{candidate_name}-Resume.{file_format}")
+
+        etag = get_generator().document_key(data, template, file_format, fit_pages)
+        headers = {"ETag": f'"{etag}"'}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        if file_format == "pdf":
+            buffer = await render(get_generator().generate_pdf, data, template, fit_pages)
+            media_type = "application/pdf"
+        else:
+            buffer = await render(get_generator().generate_docx, data, template)
+            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{filename}"
+        return Response(buffer.getvalue(), media_type=media_type, headers=headers)
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+# --- PREVIEW (RENDER ONCE, SERVE BY URL) ---
+async def create_preview(request):
+    request_data = await request_body(request)
+    data = parse_resume(request_data.get("data", {})).to_dict()
+    template = request_data.get("template", "Minimal")
+    fit_pages = fit_pages_option(request_data)
+    try:
+        key = get_generator().document_key(data, template, "pdf", fit_pages)
+        await render(get_generator().generate_pdf, data, template, fit_pages)
+        return JSONResponse({"key": key, "url": f"/api/preview/{key}.pdf"})
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, 500)
+
+
+app = Starlette(
+    routes=[
+        route("/api/enhance-summary", enhance_summary),
+        route("/api/enhance-experience", enhance_experience),
+        route("/api/enhance-skills", enhance_skills),
+        route("/api/enhance-projects", enhance_projects),
+        route("/api/enhance-summary/stream", enhance_summary_stream),
+        route("/api/enhance-experience/stream", enhance_experience_stream),
+        route("/api/enhance-skills/stream", enhance_skills_stream),
+        route("/api/enhance-projects/stream", enhance_projects_stream),
+        route("/api/generate-ai-resume", generate_ai_resume),
+        route("/api/generate-ai-resume/stream", generate_ai_resume_stream),
+        route("/download-resume", download_resume),
+        route("/api/preview", create_preview),
+        # Everything else keeps its Flask view, run on a2wsgi's thread pool
+        Mount("/", app=WSGIMiddleware(flask_app)),
+    ],
+    # Also answers preflights for the async routes, which Flask-CORS never sees
+    middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+)
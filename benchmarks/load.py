@@ -0,0 +1,347 @@
+"""
+End-to-end load test: the real API against a mock Ollama, at rising concurrency.
+
+Starts benchmarks.mock_ollama in-process, launches the API pointed at it (Flask
+dev server, uvicorn ASGI or gunicorn), then replays streamlit.py's call patterns
+with N virtual users per stage. Reports p50/p90/p99 latency, throughput and
+error rate per step; save a run and compare later ones against it.
+
+    python -m benchmarks.load                                      # flask, every scenario, 1/4/16 users
+    python -m benchmarks.load --server asgi --concurrency 1,16,64,256 --duration 30
+    python -m benchmarks.load --scenario previews --concurrency 8  # one call pattern
+    python -m benchmarks.load --url http://localhost:5000          # an already running server
+    python -m benchmarks.load --save load.json                     # record a baseline
+    python -m benchmarks.load --compare load.json                  # flag regressions (exit 1)
+    python -m benchmarks.load --deadline 5 --prefill-ms 2000       # request budgets vs a slow model
+
+Each virtual user owns a distinct resume, so the LLM cache only helps where it
+would for a real user (repeat clicks, unchanged sections); between iterations
+a user edits one experience entry with probability --edit-rate. Responses that
+came back with safety-net text after a missed deadline count as degraded, not
+as errors.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.mock_ollama import MockOllama
+from benchmarks.run import make_resume
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = ("Minimal", "Modern")
+
+
+# --- Virtual users ---
+class VirtualUser:
+    """One browser session of streamlit.py: its own HTTP session, resume and last enhance responses."""
+
+    def __init__(self, base_url, user_id, rng, record, deadline=None):
+        self.base_url = base_url
+        self.rng = rng
+        self.record = record
+        self.session = requests.Session()
+        if deadline:
+            self.session.headers["X-Request-Timeout"] = str(deadline)
+        self.template = rng.choice(TEMPLATES)
+        # The sidebar's "Fit to one page" checkbox
+        self.fit_pages = rng.choice((None, 1))
+        self.resume = make_resume(rng.randint(1, 4))
+        self.resume["personalInfo"]["name"] = f"Load User {user_id}"
+        for i, exp in enumerate(self.resume["experience"]):
+            exp["description"] = f"- Owned service {user_id}.{i}\n- Reviewed code\n- Ran on-call"
+        self.previous = {}
+        self.edits = 0
+
+    def edit(self):
+        # Like typing into one Description box
+        self.edits += 1
+        exp = self.rng.choice(self.resume["experience"])
+        exp["description"] += f"\n- Shipped change {self.edits}"
+
+    def post(self, step, path, payload):
+        started = time.perf_counter()
+        try:
+            res = self.session.post(self.base_url + path, json=payload, timeout=300)
+            ok = res.ok
+            body = res.json() if ok and res.headers.get("Content-Type", "").startswith("application/json") else None
+        except requests.RequestException:
+            ok, body = False, None
+        self.record(step, time.perf_counter() - started, ok, degraded=bool(body and body.get("degraded")))
+        return body
+
+    def get(self, step, path):
+        started = time.perf_counter()
+        try:
+            ok = self.session.get(self.base_url + path, timeout=300).ok
+        except requests.RequestException:
+            ok = False
+        self.record(step, time.perf_counter() - started, ok)
+
+    def stream(self, step, path, payload):
+        """Consume a Server-Sent Events endpoint; also records time to the first event."""
+        started = time.perf_counter()
+        first = None
+        ok = True
+        degraded = False
+        try:
+            with self.session.post(self.base_url + path, json=payload, stream=True, timeout=300) as res:
+                ok = res.ok
+                for line in res.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    if first is None:
+                        first = time.perf_counter() - started
+                    event = json.loads(line[len("data: "):]).get("event")
+                    ok = ok and event != "error"
+                    degraded = degraded or event == "degraded"
+        except requests.RequestException:
+            ok = False
+        self.record(step, time.perf_counter() - started, ok, first, degraded)
+
+
+# --- Scenarios (one iteration of a user's session each) ---
+def enhance_sections(user):
+    """Every Enhance button on the page, top to bottom."""
+    resume = user.resume
+    user.stream("enhance-summary/stream", "/api/enhance-summary/stream",
+                {"personalInfo": resume["personalInfo"], "summary": resume["summary"]})
+    user.post("enhance-skills", "/api/enhance-skills", {"skills": resume["skills"]})
+    user.post("enhance-education", "/api/enhance-education", {"education": resume["education"]})
+    for section in ("experience", "projects"):
+        body = user.post(f"enhance-{section}", f"/api/enhance-{section}",
+                         {section: copy.deepcopy(resume[section]), "previous": user.previous.get(section)})
+        if body:
+            user.previous[section] = body
+
+
+def generate_ai_resume(user):
+    """The "Enhance with AI" button."""
+    user.stream("generate-ai-resume/stream", "/api/generate-ai-resume/stream", {"data": user.resume, "template": user.template})
+
+
+def previews(user):
+    """Reruns refreshing the preview, then a few downloads of the same resume."""
+    payload = {"data": user.resume, "template": user.template, "fitPages": user.fit_pages}
+    body = user.post("preview", "/api/preview", payload)
+    if body:
+        user.get("preview-pdf", body["url"])
+    for _ in range(3):
+        user.post("download-resume", "/download-resume", {**payload, "format": "pdf"})
+
+
+SCENARIOS = {"enhance": enhance_sections, "generate": generate_ai_resume, "previews": previews}
+
+
+# --- Stages ---
+def run_stage(base_url, scenarios, users, duration, seed, edit_rate, deadline=None):
+    records = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def record(step, seconds, ok, first=None, degraded=False):
+        with lock:
+            records.append((step, seconds, ok, first, degraded))
+
+    def session(user_id):
+        rng = random.Random(seed * 100003 + user_id)
+        user = VirtualUser(base_url, user_id, rng, record, deadline)
+        while time.monotonic() < stop_at:
+            rng.choice(scenarios)(user)
+            if rng.random() < edit_rate:
+                user.edit()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(records, time.perf_counter() - started)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(records, elapsed):
+    steps = {}
+    for step, seconds, ok, first, degraded in records:
+        entry = steps.setdefault(step, {"latencies": [], "firsts": [], "errors": 0, "degraded": 0})
+        entry["latencies"].append(seconds)
+        if first is not None:
+            entry["firsts"].append(first)
+        if not ok:
+            entry["errors"] += 1
+        if degraded:
+            entry["degraded"] += 1
+
+    summary = {}
+    for step, entry in sorted(steps.items()):
+        latencies = sorted(entry["latencies"])
+        firsts = sorted(entry["firsts"])
+        summary[step] = {
+            "requests": len(latencies),
+            "error_rate": entry["errors"] / len(latencies),
+            "degraded_rate": entry["degraded"] / len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p90_ms": percentile(latencies, 0.90) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "first_event_p50_ms": percentile(firsts, 0.50) * 1000 if firsts else None,
+        }
+    return summary
+
+
+def print_stage(users, summary, mock):
+    print(f"\n== {users} concurrent user(s) ==")
+    print(f"{'step':<28}{'requests':>9}{'errors':>8}{'degraded':>9}{'req/s':>8}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'first p50':>11}")
+    for step, r in summary.items():
+        first = f"{r['first_event_p50_ms']:.0f}" if r["first_event_p50_ms"] is not None else "-"
+        print(f"{step:<28}{r['requests']:>9}{r['error_rate']:>8.1%}{r['degraded_rate']:>9.1%}{r['rps']:>8.1f}"
+              f"{r['p50_ms']:>10.0f}{r['p90_ms']:>10.0f}{r['p99_ms']:>10.0f}{r['max_ms']:>10.0f}{first:>11}")
+    if mock is not None:
+        print(f"mock ollama: {mock.stats['requests']} calls, {mock.stats['failures']} failed, "
+              f"{mock.stats['cancelled']} cancelled, {mock.stats['tokens']} tokens, max queued {mock.stats['max_queued']}")
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for stage, steps in results.items():
+        for step, result in steps.items():
+            before = baseline.get(stage, {}).get(step)
+            if not before:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if before[metric] and result[metric] > before[metric] * (1 + threshold):
+                    regressions.append(f"{stage} {step}: {metric} {before[metric]:.0f} -> {result[metric]:.0f} "
+                                       f"(+{(result[metric] / before[metric] - 1) * 100:.0f}%)")
+            for metric in ("error_rate", "degraded_rate"):
+                if result[metric] > before.get(metric, 0.0) + 0.01:
+                    regressions.append(f"{stage} {step}: {metric} {before.get(metric, 0.0):.1%} -> {result[metric]:.1%}")
+    return regressions
+
+
+# --- Server under test ---
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server, port):
+    if server == "flask":
+        return [sys.executable, "-c", f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    if server == "asgi":
+        return [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning", "asgi:app"]
+
+
+def start_server(server, ollama_url, workdir, overrides):
+    port = free_port()
+    env = {
+        **os.environ,
+        "RESUME_AI_OLLAMA_HOSTS": ollama_url,
+        "RESUME_BIND": f"127.0.0.1:{port}",
+        "RESUME_JOBS_DB": os.path.join(workdir, "jobs.db"),
+        "RESUME_RENDER_SPOOL": os.path.join(workdir, "spool"),
+        "RESUME_AI_CACHE_DB": "",
+        **overrides,
+    }
+    # Access logs can fill a pipe and stall the server, so they go to a file
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(server_command(server, port), cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(log_path) as log:
+                raise RuntimeError(f"{server} server exited:\n{log.read()}")
+        try:
+            if requests.get(base_url + "/api/ready", timeout=2).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"{server} server not ready after 60 s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the resume API against a mock Ollama.")
+    parser.add_argument("--server", choices=("flask", "asgi", "gunicorn"), default="flask")
+    parser.add_argument("--url", help="test this running server instead of starting one (and no mock)")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="call pattern(s) to replay; default: all, mixed per iteration")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated virtual users per stage")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per stage")
+    parser.add_argument("--edit-rate", type=float, default=0.5, help="chance a user edits an entry between iterations")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prefill-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--parallel", type=int, default=4, help="mock Ollama's concurrent generations")
+    parser.add_argument("--deadline", type=float, help="X-Request-Timeout to send (seconds); default: the server's")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra server environment")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed p50/p99 slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    scenarios = [SCENARIOS[name] for name in (args.scenario or sorted(SCENARIOS))]
+
+    mock = process = None
+    workdir = tempfile.mkdtemp(prefix="resume-load-")
+    try:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            mock = MockOllama(prefill_ms=args.prefill_ms, tokens_per_second=args.tokens_per_second,
+                              failure_rate=args.failure_rate, parallel=args.parallel, seed=args.seed).start()
+            overrides = dict(item.split("=", 1) for item in args.env)
+            process, base_url = start_server(args.server, mock.url, workdir, overrides)
+
+        results = {}
+        for users in (int(n) for n in args.concurrency.split(",")):
+            if mock is not None:
+                mock.stats.update(requests=0, failures=0, cancelled=0, tokens=0, max_queued=0)
+            results[f"c{users}"] = run_stage(base_url, scenarios, users, args.duration, args.seed, args.edit_rate, args.deadline)
+            print_stage(users, results[f"c{users}"], mock)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if mock is not None:
+            mock.stop()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
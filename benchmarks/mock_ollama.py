@@ -0,0 +1,224 @@
+"""
+Local stand-in for an Ollama server, for load tests that shouldn't burn GPU time.
+
+Speaks enough of Ollama's HTTP API for ChatOllama (/api/chat, streamed NDJSON or
+a single JSON body, plus /api/tags and /api/version). Replies come from
+llm_backend.canned_completion, paced like a real model:
+
+- prefill: fixed delay before the first token
+- tokens_per_second: pacing of every following token (one word = one token)
+- parallel: generations running at once, like OLLAMA_NUM_PARALLEL; the rest queue
+- failure_rate: fraction of calls answered with HTTP 500
+
+Like Ollama, a generation stops when its client disconnects (a request deadline
+or a closed stream); those calls are counted as cancelled.
+
+num_predict and stop from the request options are honoured, so the agent's
+generation limits show up in the timings.
+
+    python -m benchmarks.mock_ollama --port 11435 --prefill-ms 300 --tokens-per-second 40
+"""
+import argparse
+import json
+import random
+import select
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_backend import canned_completion
+
+
+class MockOllama:
+    def __init__(self, host="127.0.0.1", port=0, prefill_ms=300.0, tokens_per_second=40.0,
+                 failure_rate=0.0, parallel=4, seed=None):
+        self.prefill = prefill_ms / 1000
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self._slots = threading.BoundedSemaphore(max(1, parallel))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0, "cancelled": 0, "tokens": 0, "max_queued": 0, "queued": 0}
+
+        handler = type("Handler", (_Handler,), {"mock": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    #Helpers
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+            self.stats["max_queued"] = max(self.stats["max_queued"], self.stats["queued"])
+
+    def _fails(self):
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def _reply(self, body):
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        text = canned_completion(prompt)
+        options = body.get("options") or {}
+        for stop in options.get("stop") or []:
+            if stop in text:
+                text = text[:text.index(stop)]
+        # Keep the separators so the streamed chunks join back into the same text
+        tokens = [word + " " for word in text.split(" ")]
+        tokens[-1] = tokens[-1][:-1]
+        done_reason = "stop"
+        limit = options.get("num_predict")
+        if limit and limit > 0 and len(tokens) > limit:
+            tokens, done_reason = tokens[:limit], "length"
+        return tokens, len(prompt.split()), done_reason
+
+
+class _Handler(BaseHTTPRequestHandler):
+    mock = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/api/version":
+            self._json(200, {"version": "0.0.0-mock"})
+        elif self.path == "/api/tags":
+            self._json(200, {"models": []})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/api/chat":
+            self._json(404, {"error": "not found"})
+            return
+
+        mock = self.mock
+        mock._count(requests=1)
+        if mock._fails():
+            mock._count(failures=1)
+            self._json(500, {"error": "mock failure"})
+            return
+
+        tokens, prompt_tokens, done_reason = mock._reply(body)
+        mock._count(queued=1)
+        with mock._slots:
+            mock._count(queued=-1)
+            started = time.perf_counter()
+            prefilled = None
+            try:
+                if not self._wait(mock.prefill):
+                    raise ConnectionResetError
+                prefilled = time.perf_counter()
+                if body.get("stream", True):
+                    self._stream(body, tokens)
+                elif not self._wait(len(tokens) / mock.tokens_per_second):
+                    raise ConnectionResetError
+            except (BrokenPipeError, ConnectionResetError):
+                mock._count(cancelled=1)
+                self.close_connection = True
+                return
+        mock._count(tokens=len(tokens))
+
+        final = {
+            "model": body.get("model", "mock"),
+            "created_at": _now(),
+            "message": {"role": "assistant", "content": "" if body.get("stream", True) else "".join(tokens)},
+            "done": True,
+            "done_reason": done_reason,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int((prefilled - started) * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int((time.perf_counter() - prefilled) * 1e9),
+        }
+        try:
+            if body.get("stream", True):
+                self._chunk(json.dumps(final) + "\n")
+                self._chunk("")
+            else:
+                self._json(200, final)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _wait(self, seconds):
+        """Sleep like a busy model, but give up as soon as the client hangs up."""
+        end = time.perf_counter() + seconds
+        while True:
+            remaining = end - time.perf_counter()
+            if remaining <= 0:
+                return True
+            readable, _, _ = select.select([self.connection], [], [], min(remaining, 0.05))
+            if readable and not self.connection.recv(1, socket.MSG_PEEK):
+                return False
+
+    def _stream(self, body, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        delay = 1 / self.mock.tokens_per_second
+        for token in tokens:
+            time.sleep(delay)
+            chunk = {"model": body.get("model", "mock"), "created_at": _now(),
+                     "message": {"role": "assistant", "content": token}, "done": False}
+            self._chunk(json.dumps(chunk) + "\n")
+
+    def _chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a mock Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--prefill-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--parallel", type=int, default=4, help="generations served at once (OLLAMA_NUM_PARALLEL)")
+    args = parser.parse_args(argv)
+
+    mock = MockOllama(args.host, args.port, args.prefill_ms, args.tokens_per_second, args.failure_rate, args.parallel)
+    print(f"Mock Ollama listening on {mock.url}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+"""
+Micro-benchmarks for the PDF renderers and ResumeAIAgent.
+
+The agent runs against llm_backend.FakeLLM (deterministic, in-process), so numbers measure
+our own prompt building, parsing and safety-net code rather than Ollama.
+
+    python -m benchmarks.run                          # print results
+    python -m benchmarks.run --save baseline.json     # record a baseline
+    python -m benchmarks.run --compare baseline.json  # flag regressions (exit 1)
+    python -m benchmarks.run --filter render          # subset by name
+"""
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from ai_agent import ResumeAIAgent
+from llm_backend import FakeLLM, canned_completion
+from document_model import build_document
+from templates_file.minimal_template import MINIMAL_TEMPLATE, build_minimal_template
+from templates_file.modern_template import MODERN_TEMPLATE, build_modern_template
+
+
+# --- Fixtures ---
+LONG_DESCRIPTION = "\n".join(
+    f"- Led a cross-functional initiative number {i} that improved delivery speed and reduced incident volume across teams"
+    for i in range(6)
+)
+
+
+UNKNOWN_SKILLS = ("Salesforce CPQ", "Stakeholder Mapping")
+
+
+def make_resume(entries, long_descriptions=False):
+    return {
+        "personalInfo": {"name": "Bench Mark", "email": "bench@example.com", "phone": "555-0100",
+                         "linkedin": "linkedin.com/in/bench", "github": "github.com/bench"},
+        "summary": "Engineer with a track record of shipping reliable systems. " * 3,
+        # The last two aren't in the skill taxonomy, so organizing still asks the model
+        "skills": ["Python", "Go", "SQL", "Docker", "Kubernetes", "Flask", "Communication", "Leadership", *UNKNOWN_SKILLS],
+        "education": [{"degree": "BSc Computer Science", "institution": "State University", "year": "2015"}],
+        "experience": [
+            {"jobTitle": f"Engineer {i}", "company": f"Company {i}", "duration": "2019-2021",
+             "description": LONG_DESCRIPTION if long_descriptions else "- Built services & APIs\n- Kept p99 < 200ms\n- Ran on-call"}
+            for i in range(entries)
+        ],
+        "projects": [{"title": f"Project {i}", "description": "A tool that does useful things.", "technologies": "Python"}
+                     for i in range(3)],
+        "certifications": [{"title": "Cloud Practitioner", "organization": "AWS", "year": "2022"}],
+    }
+
+
+def make_agent(responder=canned_completion, **kwargs):
+    return ResumeAIAgent(llm=FakeLLM(responder), **kwargs)
+
+
+# --- Benchmarks ---
+def render_benchmarks():
+    cases = {}
+    for builder, name in ((build_minimal_template, "minimal"), (build_modern_template, "modern")):
+        for entries in (1, 5, 10, 20):
+            data = make_resume(entries)
+            cases[f"render.{name}.{entries}_entries"] = lambda b=builder, d=data: b(io.BytesIO(), d)
+        data = make_resume(20, long_descriptions=True)
+        cases[f"render.{name}.multipage_long"] = lambda b=builder, d=data: b(io.BytesIO(), d)
+    for template, name in ((MINIMAL_TEMPLATE, "minimal"), (MODERN_TEMPLATE, "modern")):
+        # Two pages' worth squeezed onto one: search plus the final render
+        document = build_document(make_resume(12))
+        cases[f"render.{name}.fit_one_page"] = lambda t=template, d=document: t.build(io.BytesIO(), d, fit_pages=1)
+    return cases
+
+
+def agent_benchmarks():
+    agent = make_agent()
+    batched = make_agent(batch_entries=True)
+    # Refusals drive every safety-net fallback path
+    refusing = make_agent(lambda text: "I'm sorry, please provide more details.")
+    small, large = make_resume(1), make_resume(10)
+    skills = large["skills"]
+
+    known_skills = [skill for skill in skills if skill not in UNKNOWN_SKILLS]
+    organized_text = ("Programming Languages: Python, Go, SQL\nFrameworks/Tools: Docker, Kubernetes, Flask\n"
+                      "Soft Skills: Communication, Leadership\nDomain Expertise: Salesforce CPQ, Stakeholder Mapping")
+    return {
+        "agent.summary": lambda: agent.enhance_summary(large),
+        "agent.experience.1_entry": lambda: agent.enhance_experience([dict(e) for e in small["experience"]]),
+        "agent.experience.10_entries": lambda: agent.enhance_experience([dict(e) for e in large["experience"]]),
+        "agent.experience.10_entries_batched": lambda: batched.enhance_experience([dict(e) for e in large["experience"]]),
+        "agent.projects.3_entries": lambda: agent.enhance_projects([dict(p) for p in large["projects"]]),
+        "agent.skills.organize": lambda: agent.organize_skills(skills),
+        "agent.skills.organize_known": lambda: agent.organize_skills(known_skills),
+        "agent.skills.parse": lambda: agent._parse_skills(organized_text, skills),
+        "agent.resume.10_entries": lambda: agent.enhance_resume(make_resume(10)),
+        "agent.safety_net.summary": lambda: refusing.enhance_summary(large),
+        "agent.safety_net.experience": lambda: refusing.enhance_experience([dict(e) for e in large["experience"]]),
+        "agent.safety_net.skills": lambda: refusing.organize_skills(skills),
+    }
+
+
+def measure(fn, repeat, warmup=2):
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    # Separate pass so tracemalloc overhead doesn't skew the timings
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in ("median_ms", "peak_kib"):
+            if before[metric] and result[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before[metric]:.2f} -> {result[metric]:.2f} "
+                                   f"(+{(result[metric] / before[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run renderer and agent micro-benchmarks.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    cases = {**render_benchmarks(), **agent_benchmarks()}
+    results = {}
+    for name, fn in cases.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(fn, args.repeat)
+        r = results[name]
+        print(f"{name:<45} median {r['median_ms']:9.3f} ms   min {r['min_ms']:9.3f} ms   peak {r['peak_kib']:9.1f} KiB")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Bulk resume rendering across a process pool.
+
+Input is JSONL: one /download-resume style payload per line
+({"data": {...}, "template": "Modern"}), or a bare resume dict.
+
+    python bulk_render.py resumes.jsonl --out resumes.zip --processes 8
+    python bulk_render.py resumes.jsonl --out-dir rendered/
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+
+from doc_generator import ResumeGenerator
+from resume_model import parse_resume
+
+
+_generator = None
+
+
+def _init_worker(template_modules):
+    global _generator
+    # Nothing is re-rendered inside one bulk run, so skip the bytes cache
+    _generator = ResumeGenerator(cache_size=0, template_modules=template_modules)
+
+
+def render_line(item):
+    """Render one (index, raw JSONL line) pair -> (index, filename, pdf bytes or None, error or None)."""
+    index, line = item
+    try:
+        payload = json.loads(line)
+        if not isinstance(payload, dict):
+            raise ValueError("line is not a resume object")
+        data = parse_resume(payload.get("data", payload)).to_dict()
+        template = payload.get("template", "Minimal")
+
+        candidate_name = (data["personalInfo"]["name"] or "User").replace(" ", "-")
+        filename = f"{index:06d}-{candidate_name}-Resume.pdf"
+        return index, filename, _generator.generate_pdf(data, template).getvalue(), None
+    except Exception as e:
+        return index, None, None, str(e)
+
+
+def make_pool(processes=None, template_modules=()):
+    """
+    Render worker pool. Workers are spawned rather than forked, so a pool created
+    inside a threaded server doesn't inherit its held locks and executors.
+    """
+    context = multiprocessing.get_context("spawn")
+    return context.Pool(processes, initializer=_init_worker, initargs=(list(template_modules),))
+
+
+def render_jsonl(lines, processes=None, template_modules=(), chunksize=4, pool=None):
+    """
+    Yield render_line() results in input order. Blank lines are skipped but
+    still count towards the index so errors point at the right line.
+
+    With a long-lived `pool` (the server's), at most `processes` lines of this
+    batch are in flight at once; otherwise a pool of that size is made for the call.
+    """
+    items = ((index, line) for index, line in enumerate(lines, 1) if line.strip())
+    if pool is not None:
+        pending = collections.deque()
+        for item in items:
+            pending.append(pool.apply_async(render_line, (item,)))
+            if len(pending) >= (processes or 1):
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        return
+    with make_pool(processes, template_modules) as pool:
+        yield from pool.imap(render_line, items, chunksize=chunksize)
+
+
+def write_zip(results, fileobj):
+    """Write rendered PDFs plus errors.json into a ZIP. Returns (rendered, failed) counts."""
+    errors = []
+    rendered = 0
+    # PDFs are already deflated internally; storing avoids burning CPU twice
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        for index, filename, pdf_bytes, error in results:
+            if error:
+                errors.append({"line": index, "error": error})
+                continue
+            archive.writestr(filename, pdf_bytes)
+            rendered += 1
+        archive.writestr("errors.json", json.dumps(errors, indent=2))
+    return rendered, len(errors)
+
+
+def write_directory(results, out_dir):
+    """Write rendered PDFs plus errors.json into out_dir. Returns (rendered, failed) counts."""
+    os.makedirs(out_dir, exist_ok=True)
+    errors = []
+    rendered = 0
+    for index, filename, pdf_bytes, error in results:
+        if error:
+            errors.append({"line": index, "error": error})
+            continue
+        with open(os.path.join(out_dir, filename), "wb") as f:
+            f.write(pdf_bytes)
+        rendered += 1
+    with open(os.path.join(out_dir, "errors.json"), "w") as f:
+        json.dump(errors, f, indent=2)
+    return rendered, len(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a JSONL file of resumes to PDFs.")
+    parser.add_argument("input", help="JSONL file, or - for stdin")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="write a ZIP archive here")
+    target.add_argument("--out-dir", help="write PDFs into this directory")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--template-module", action="append", default=[], help="extra template module to register")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    started = time.perf_counter()
+    with source:
+        results = render_jsonl(source, args.processes, args.template_module)
+        if args.out:
+            with open(args.out, "wb") as f:
+                rendered, failed = write_zip(results, f)
+        else:
+            rendered, failed = write_directory(results, args.out_dir)
+    elapsed = time.perf_counter() - started
+
+    print(f"rendered={rendered} failed={failed} seconds={elapsed:.2f} "
+          f"resumes_per_second={rendered / elapsed if elapsed else 0:.1f} "
+          f"processes={args.processes or os.cpu_count()}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Per-request time budgets for LLM work.
+
+app.py and asgi.py open a Deadline for every enhancement request (X-Request-Timeout
+header, else RESUME_AI_DEADLINE). ResumeAIAgent reads current() before each model
+call and waits at most what is left of the budget. A section whose call can't finish
+in time gets its safety-net text and is listed in `degraded`, so the response still
+arrives on time instead of erroring.
+
+The deadline lives in a ContextVar: asyncio tasks inherit it, and the agent copies
+the context into its pool threads.
+"""
+import contextvars
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+
+_current = contextvars.ContextVar("resume_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Too little of the request's budget is left to start or finish a model call."""
+
+
+class Deadline:
+    # Below this a call can't get past prefill, so it isn't started at all
+    MIN_CALL_SECONDS = 0.25
+
+    def __init__(self, seconds: Optional[float]):
+        """seconds=None means no limit: nothing is bounded and nothing degrades."""
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds if seconds is not None else None
+        self.degraded: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        if self.expires is None:
+            return float("inf")
+        return max(0.0, self.expires - time.monotonic())
+
+    def timeout(self, minimum: float = MIN_CALL_SECONDS) -> float:
+        """
+        Timeout for the next model call: the rest of the budget. Raises DeadlineExceeded
+        when less than `minimum` is left (pass 0 for the next chunk of a running stream).
+        """
+        remaining = self.remaining()
+        if remaining <= 0 or remaining < minimum:
+            raise DeadlineExceeded(f"request deadline of {self.seconds:g}s reached")
+        return remaining
+
+    def degrade(self, section: str) -> None:
+        """Record that `section` got safety-net text because the budget ran out."""
+        with self._lock:
+            if section not in self.degraded:
+                self.degraded.append(section)
+
+    def is_degraded(self, section: str) -> bool:
+        with self._lock:
+            return section in self.degraded
+
+    # Active for the code inside the with-block (and the tasks and pool jobs it starts)
+    def __enter__(self) -> "Deadline":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        _current.reset(self._token)
+
+    def iterate(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        """
+        Yield from a lazy iterator (a streaming response) with this deadline active
+        while each item is produced; the server pulls items after the view returned.
+        """
+        context = contextvars.copy_context()
+        context.run(_current.set, self)
+        try:
+            while True:
+                try:
+                    item = context.run(next, iterator)
+                except StopIteration:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                context.run(close)
+
+    async def aiterate(self, iterator: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Async twin of iterate(). Each ASGI request streams from its own task, so setting it here only affects that task."""
+        _current.set(self)
+        async for item in iterator:
+            yield item
+
+
+class SharedDeadline(Deadline):
+    """
+    Budget of one model call several requests wait on (llm_cache.SingleFlight): what is
+    left of the longest of their deadlines, so the call lasts as long as anyone still
+    waits for it. `deadlines` is the flight's live list; None stands for no limit.
+    """
+
+    def __init__(self, deadlines: List[Optional[Deadline]]):
+        super().__init__(None)
+        self.deadlines = deadlines
+        self.seconds = max((d.seconds for d in deadlines if d is not None), default=0)
+
+    def remaining(self) -> float:
+        deadlines = list(self.deadlines)
+        if not deadlines:
+            # Nobody is waiting any more
+            return 0.0
+        if None in deadlines:
+            return float("inf")
+        return max(d.remaining() for d in deadlines)
+
+
+def current() -> Optional[Deadline]:
+    """The active request's deadline, or None when there is none or it is unlimited."""
+    deadline = _current.get()
+    return deadline if deadline is not None and deadline.remaining() != float("inf") else None
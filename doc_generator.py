@@ -1,29 +1,198 @@
 import io
-import docx
-from templates_file.minimal_template import build_minimal_template
-from templates_file.modern_template import build_modern_template
-from docx import Document
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+import importlib
+import time
+from collections import OrderedDict
+import templates_file.minimal_template  # noqa: F401 (registers "Minimal")
+import templates_file.modern_template  # noqa: F401 (registers "Modern")
+from templates_file.registry import get_template, template_names
+from document_model import build_document
+from metrics import RENDER_BYTES, RENDER_CACHE, RENDER_FIT, RENDER_LATENCY
+
+
+# Small but touches every section renderer; the markup characters guard the PDF escaping
+WARM_UP_RESUME = {
+    "personalInfo": {"name": "Warm Up", "email": "warm@example.com", "phone": "555-0100",
+                     "linkedin": "linkedin.com/in/warmup", "github": "github.com/warmup"},
+    "summary": "Engineer.",
+    "skills": ["Python"],
+    "education": [{"degree": "BSc", "institution": "University", "year": "2020"}],
+    "experience": [{"jobTitle": "R&D Lead", "company": "Company <Labs>", "duration": "2020-2024", "description": "- Kept p99 < 200ms"}],
+    "projects": [{"title": "Project", "description": "A tool.", "technologies": "Python"}],
+    "certifications": [{"title": "Certificate", "organization": "Org", "year": "2021"}],
+}
+
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def renderer_version(modules=()):
+    """
+    Hash of the renderer sources: document_model, this module, every file in
+    templates_file and any extra template modules. A deploy that changes how
+    a resume is drawn changes every document_key(), so caches never serve old bytes.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    templates = os.path.join(here, "templates_file")
+    paths = [os.path.join(here, "document_model.py"), os.path.abspath(__file__)]
+    paths += sorted(os.path.join(templates, name) for name in os.listdir(templates) if name.endswith(".py"))
+    paths += [os.path.abspath(importlib.import_module(module).__file__) for module in modules]
+
+    digest = hashlib.sha256()
+    for path in dict.fromkeys(paths):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
 
 
 class ResumeGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, cache_size=128, template_modules=(), spool_dir=None, spool_size=1024):
+        # Extra template modules register themselves on import
+        for module in template_modules:
+            importlib.import_module(module)
+        self.renderer_version = renderer_version(template_modules)
+
+        # Bounded LRUs: rendered bytes keyed by document_key(), parsed layouts keyed by data hash
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Optional directory shared by every worker process: a preview rendered by one
+        # worker can then be served by another
+        self.spool_dir = spool_dir
+        self.spool_size = spool_size
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+    def document_key(self, data, template="Minimal", file_format="pdf", fit_pages=None):
+        """
+        Canonical hash of everything that affects the rendered bytes.
+        Doubles as the HTTP ETag for /download-resume; the renderer version
+        keeps an immutable preview from outliving the code that drew it.
+        """
+        options = {"data": data, "template": template, "format": file_format,
+                   "renderer": self.renderer_version}
+        if fit_pages:
+            options["fitPages"] = fit_pages
+        payload = json.dumps(options, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def parse(self, data):
+        """
+        Build the format-neutral ResumeDocument once per distinct resume, so
+        PDF and DOCX output for the same data share a single parse.
+        """
+        key = self.document_key(data, None, "layout")
+        return self._cached(self._documents, key, lambda: build_document(data))
 
     #PDF
-    def generate_pdf(self, data, template="Minimal"):
+    def generate_pdf(self, data, template="Minimal", fit_pages=None):
         """
         Generate a PDF resume based on the given template.
+        fit_pages shrinks spacing and type until it fits that many pages.
         """
+        return self._render(data, template, "pdf", fit_pages)
+
+    #DOCX
+    def generate_docx(self, data, template="Minimal"):
+        """
+        Generate a DOCX resume from the same layout the PDF uses.
+        """
+        return self._render(data, template, "docx")
+
+    def templates(self):
+        return template_names()
+
+    def rendered(self, key):
+        """Previously rendered bytes for a document_key(), or None if never rendered or evicted."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if not self.spool_dir or not KEY_PATTERN.fullmatch(key):
+            return None
+        try:
+            with open(os.path.join(self.spool_dir, key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def warm_up(self):
+        """
+        Render every registered template once in each format, outside the cache,
+        so font metrics, paragraph styles and python-docx are loaded before the
+        first real request.
+        """
+        for name in template_names():
+            for file_format in ("pdf", "docx"):
+                self._emit(WARM_UP_RESUME, name, file_format)
+
+    def _render(self, data, template, file_format, fit_pages=None):
+        key = self.document_key(data, template, file_format, fit_pages)
+        hit = key in self._cache
+        RENDER_CACHE.inc(result="hit" if hit else "miss", format=file_format)
+        rendered = self._cached(self._cache, key, lambda: self._emit(data, template, file_format, fit_pages))
+        if self.spool_dir and not hit:
+            self._spool(key, rendered)
+        return io.BytesIO(rendered)
+
+    def _emit(self, data, template, file_format, fit_pages=None):
         buffer = io.BytesIO()
+        # Unknown names fall back to Minimal
+        layout = get_template(template)
+        document = self.parse(data)
 
-        if template == "Minimal":
-            build_minimal_template(buffer, data)
-        elif template == "Modern":
-            build_modern_template(buffer, data)
+        started = time.perf_counter()
+        if file_format == "docx":
+            layout.build_docx(buffer, document)
+        elif fit_pages:
+            fit = layout.build(buffer, document, fit_pages=fit_pages)
+            RENDER_FIT.inc(result="fit" if fit.fits else "overflow", template=layout.name)
         else:
-            # Default fallback
-            build_minimal_template(buffer, data)
+            layout.build(buffer, document)
+        RENDER_LATENCY.observe(time.perf_counter() - started, template=layout.name, format=file_format)
+
+        rendered = buffer.getvalue()
+        RENDER_BYTES.observe(len(rendered), template=layout.name, format=file_format)
+        return rendered
+
+    def _spool(self, key, rendered):
+        path = os.path.join(self.spool_dir, key)
+        if os.path.exists(path):
+            return
+        # Write-then-rename so another worker never reads half a file
+        fd, tmp_path = tempfile.mkstemp(dir=self.spool_dir, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(rendered)
+        os.replace(tmp_path, path)
+
+        entries = [entry for entry in os.scandir(self.spool_dir) if KEY_PATTERN.fullmatch(entry.name)]
+        if len(entries) > self.spool_size:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.spool_size]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass  # Another worker pruned it first
+
+    #Cache
+    def _cached(self, cache, key, build):
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
+        value = build()
 
-        buffer.seek(0)
-        return buffer
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return value
@@ -0,0 +1,92 @@
+"""
+Format-neutral resume layout shared by the PDF and DOCX backends.
+
+build_document() does all field extraction once (contact-line joining, bullet
+splitting, skill lists); renderers only walk the resulting tree. Text stays
+plain: the PDF section builders escape it for ReportLab's Paragraph markup, so
+"R&D" or "a<b" render as typed, and DOCX writes it as is.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class EducationItem:
+    degree: str
+    institution: str
+    year: str
+
+
+@dataclass(frozen=True)
+class ExperienceItem:
+    job_title: str
+    company: str
+    duration: str
+    bullets: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ProjectItem:
+    title: str
+    description: str
+
+
+@dataclass(frozen=True)
+class CertificationItem:
+    title: str
+    organization: str
+    year: str
+
+
+@dataclass(frozen=True)
+class ResumeDocument:
+    name: Optional[str]
+    contact: Tuple[str, ...]
+    summary: str
+    skills: Tuple[str, ...]
+    education: Tuple[EducationItem, ...]
+    experience: Tuple[ExperienceItem, ...]
+    projects: Tuple[ProjectItem, ...]
+    certifications: Tuple[CertificationItem, ...]
+
+    @property
+    def contact_line(self) -> str:
+        return " | ".join(self.contact)
+
+
+def split_bullets(description: Any) -> Tuple[str, ...]:
+    if not description:
+        return ()
+    return tuple(line.strip() for line in str(description).split("\n") if line.strip())
+
+
+def build_document(data: Dict[str, Any]) -> ResumeDocument:
+    personal_info = data.get("personalInfo", {})
+    return ResumeDocument(
+        # None (not "") when absent, so templates can pick their own placeholder
+        name=personal_info.get("name"),
+        contact=tuple(filter(None, [
+            personal_info.get("email", ""),
+            personal_info.get("phone", ""),
+            personal_info.get("linkedin", ""),
+            personal_info.get("github", ""),
+        ])),
+        summary=data.get("summary") or "",
+        skills=tuple(data.get("skills") or ()),
+        education=tuple(
+            EducationItem(edu.get("degree", ""), edu.get("institution", ""), edu.get("year", ""))
+            for edu in data.get("education") or ()
+        ),
+        experience=tuple(
+            ExperienceItem(exp.get("jobTitle", ""), exp.get("company", ""), exp.get("duration", ""), split_bullets(exp.get("description")))
+            for exp in data.get("experience") or ()
+        ),
+        projects=tuple(
+            ProjectItem(proj.get("title", ""), proj.get("description", ""))
+            for proj in data.get("projects") or ()
+        ),
+        certifications=tuple(
+            CertificationItem(cert.get("title", ""), cert.get("organization", ""), cert.get("year", ""))
+            for cert in data.get("certifications") or ()
+        ),
+    )
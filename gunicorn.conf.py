@@ -0,0 +1,48 @@
+"""
+Production launch for the ASGI server (asgi.py):
+
+    gunicorn -c gunicorn.conf.py asgi:app
+
+Each worker is a process with its own event loop, agent and render cache. A
+request waiting on Ollama costs a coroutine, not a worker, so a few workers
+serve hundreds of concurrent enhancements; add workers for rendering CPU, not
+for LLM concurrency. Ollama's own queue (OLLAMA_NUM_PARALLEL, OLLAMA_MAX_QUEUE)
+still decides how many generations actually run at once.
+
+Every setting can be overridden from the environment:
+
+    RESUME_BIND=0.0.0.0:5000 RESUME_WORKERS=4 gunicorn -c gunicorn.conf.py asgi:app
+"""
+import multiprocessing
+import os
+import tempfile
+
+
+bind = os.environ.get("RESUME_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("RESUME_WORKERS", min(4, multiprocessing.cpu_count())))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# The event loop heartbeats while requests wait on Ollama, so this only fires for
+# a worker that is genuinely stuck (e.g. a render that never finishes)
+timeout = int(os.environ.get("RESUME_WORKER_TIMEOUT", "120"))
+# Let in-flight generations and streams finish on deploys
+graceful_timeout = int(os.environ.get("RESUME_GRACEFUL_TIMEOUT", "60"))
+# Longer than the usual 60 s load-balancer idle timeout, so the proxy closes first
+keepalive = 75
+
+# Recycle workers now and then; the jitter keeps them from restarting together
+max_requests = int(os.environ.get("RESUME_MAX_REQUESTS", "5000"))
+max_requests_jitter = max_requests // 10
+
+# Not preloaded: the agent's async HTTP clients must be created inside each worker's loop
+preload_app = False
+
+# Workers share state only through files: rendered previews (so GET /api/preview/<key>.pdf
+# can land on any worker), the LLM cache and the job queue
+os.environ.setdefault("RESUME_RENDER_SPOOL", os.path.join(tempfile.gettempdir(), "resume-render-spool"))
+os.environ.setdefault("RESUME_AI_CACHE_DB", "resume_llm_cache.db")
+os.environ.setdefault("RESUME_JOBS_DB", "resume_jobs.db")
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("RESUME_LOG_LEVEL", "info")
@@ -0,0 +1,221 @@
+"""
+Background jobs for long-running AI resume generation.
+
+Submitting returns a job id at once; a bounded thread pool runs the work and
+records progress in SQLite, so HTTP workers only ever do short reads and a
+restart picks queued or abandoned jobs back up.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# run(payload, report) -> result; report(progress) stores a progress snapshot
+JobFunction = Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], Dict[str, Any]]
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue drained by `workers` threads.
+
+    Every state change bumps a per-job version, so clients can long-poll with
+    wait(job_id, since=version). While a job runs, its process refreshes the job's
+    heartbeat (`updated`) every `heartbeat_seconds`; a sweeper thread in every process
+    re-queues RUNNING jobs whose heartbeat is older than `stale_seconds`, i.e. jobs
+    whose process crashed or was recycled.
+    """
+
+    def __init__(self, run: JobFunction, db_path: str, workers: int = 2, max_pending: int = 100,
+                 stale_seconds: float = 60, retention_seconds: float = 86400, heartbeat_seconds: float = 10):
+        self.run = run
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.stale_seconds = stale_seconds
+        self.retention_seconds = retention_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="resume-job")
+        self._changed = threading.Condition()
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, version INTEGER NOT NULL,"
+                " payload TEXT NOT NULL, progress TEXT, result TEXT, error TEXT,"
+                " created REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated)")
+
+        threading.Thread(target=self._sweep, name="resume-job-sweeper", daemon=True).start()
+
+    #Methods
+    def submit(self, payload: Dict[str, Any], progress: Optional[Dict[str, Any]] = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchone()[0]
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+            conn.execute(
+                "INSERT INTO jobs (id, status, version, payload, progress, created, updated) VALUES (?, ?, 0, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload), json.dumps(progress or {}), now, now),
+            )
+        self._executor.submit(self._execute, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, version, progress, result, error, created, updated FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "version": row[2],
+            "progress": json.loads(row[3]) if row[3] else {},
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created": row[6],
+            "updated": row[7],
+        }
+
+    def wait(self, job_id: str, since: int = -1, timeout: float = 25.0) -> Optional[Dict[str, Any]]:
+        """Return the job once its version is past `since`, it has finished, or `timeout` runs out."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["version"] > since or job["status"] in FINISHED or remaining <= 0:
+                return job
+            # Short waits so updates written by other processes are still noticed
+            with self._changed:
+                self._changed.wait(min(remaining, 0.5))
+
+    def recover(self) -> int:
+        """Re-queue jobs left QUEUED, or RUNNING without a recent heartbeat, and drop old finished ones."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (*FINISHED, now - self.retention_seconds))
+        self._requeue_stale()
+        with self._connect() as conn:
+            job_ids = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,))]
+        for job_id in job_ids:
+            self._executor.submit(self._execute, job_id)
+        return len(job_ids)
+
+    def close(self) -> None:
+        """Stop the sweeper; jobs still running are picked up by another process once their heartbeat goes stale."""
+        self._closed.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    #Helpers
+    def _execute(self, job_id: str) -> None:
+        # Claim atomically: another process recovering the same DB may race us
+        payload = self._claim(job_id)
+        if payload is None:
+            return
+        with self._running_lock:
+            self._running.add(job_id)
+        try:
+            result = self.run(payload, lambda progress: self._update(job_id, progress=json.dumps(progress)))
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e))
+        else:
+            self._update(job_id, status=SUCCEEDED, result=json.dumps(result))
+        finally:
+            with self._running_lock:
+                self._running.discard(job_id)
+
+    def _sweep(self) -> None:
+        while not self._closed.wait(self.heartbeat_seconds):
+            # A locked or briefly unavailable database must not kill the sweeper; retry next beat
+            try:
+                self._heartbeat()
+                for job_id in self._requeue_stale():
+                    self._executor.submit(self._execute, job_id)
+            except sqlite3.Error:
+                continue
+
+    def _heartbeat(self) -> None:
+        # Only `updated` changes: long-pollers wait on versions and aren't woken by heartbeats
+        with self._running_lock:
+            job_ids = list(self._running)
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.executemany("UPDATE jobs SET updated = ? WHERE id = ? AND status = ?",
+                             [(time.time(), job_id, RUNNING) for job_id in job_ids])
+
+    def _requeue_stale(self) -> List[str]:
+        """Re-queue RUNNING jobs whose heartbeat stopped; returns their ids."""
+        now = time.time()
+        requeued = []
+        with self._connect() as conn:
+            stale = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND updated < ?", (RUNNING, now - self.stale_seconds))]
+            for job_id in stale:
+                # Another process's sweeper may get there first
+                if conn.execute(
+                    "UPDATE jobs SET status = ?, version = version + 1, updated = ? WHERE id = ? AND status = ? AND updated < ?",
+                    (QUEUED, now, job_id, RUNNING, now - self.stale_seconds),
+                ).rowcount:
+                    requeued.append(job_id)
+        if requeued:
+            self._notify()
+        return requeued
+
+    def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            claimed = conn.execute(
+                "UPDATE jobs SET status = ?, version = version + 1, updated = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED),
+            ).rowcount
+            if not claimed:
+                return None
+            row = conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        self._notify()
+        return json.loads(row[0])
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {columns}, version = version + 1, updated = ? WHERE id = ?",
+                (*fields.values(), time.time(), job_id),
+            )
+        self._notify()
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Same pattern as LLMCache: one short-lived connection per operation
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
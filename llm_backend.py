@@ -0,0 +1,264 @@
+"""
+LLM backends for ResumeAIAgent.
+
+Both classes are LangChain Runnables, so they drop into `prompt | llm | parser`
+exactly where a single ChatOllama used to sit:
+
+- OllamaRouter spreads calls over several Ollama hosts, one keep-alive HTTP
+  pool per host, with least-outstanding or round-robin routing and health tracking.
+- FakeLLM answers in-process with deterministic canned text, for tests and benchmarks.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable
+from langchain_ollama import ChatOllama
+
+
+class OllamaEndpoint:
+    def __init__(self, base_url: str, llm: ChatOllama):
+        self.base_url = base_url
+        self.llm = llm
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return self.unhealthy_until <= now
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "healthy": self.healthy(time.time()),
+        }
+
+
+class OllamaRouter(Runnable):
+    """
+    Route chat calls across several Ollama hosts.
+
+    routing="least_outstanding" picks the healthy host with the fewest in-flight
+    calls (ties go round-robin); routing="round_robin" just rotates. A host that
+    fails `failure_threshold` times in a row is skipped for `cooldown_seconds`.
+    Failed calls are retried on the next host before the error reaches the agent.
+    """
+
+    def __init__(self, base_urls: List[str], model: str = "llama3.2", temperature: float = 0.7,
+                 routing: str = "least_outstanding", pool_size: int = 8,
+                 failure_threshold: int = 3, cooldown_seconds: float = 30.0, **ollama_kwargs):
+        if not base_urls:
+            raise ValueError("OllamaRouter needs at least one base URL")
+        if routing not in ("least_outstanding", "round_robin"):
+            raise ValueError(f"Unknown routing policy: {routing}")
+
+        self.model = model
+        self.temperature = temperature
+        self.routing = routing
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+        # One ChatOllama (and so one httpx connection pool) per host, reused for every call
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=60)
+        self.endpoints = [
+            OllamaEndpoint(url, ChatOllama(model=model, temperature=temperature, base_url=url,
+                                           client_kwargs={"limits": limits}, **ollama_kwargs))
+            for url in base_urls
+        ]
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+
+    #Runnable interface
+    # Every call releases its endpoint in a finally: a call abandoned by its caller (client
+    # disconnect, request deadline) is neither a success nor a host failure (ok=None)
+    def invoke(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AIMessage:
+        last_error = None
+        for endpoint in self._candidates():
+            self._acquire(endpoint)
+            ok = None
+            try:
+                result = endpoint.llm.invoke(input, config, **kwargs)
+                ok = True
+            except Exception as e:
+                ok = False
+                last_error = e
+                continue
+            finally:
+                self._release(endpoint, ok)
+            return result
+        raise last_error
+
+    def stream(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        last_error = None
+        for endpoint in self._candidates():
+            self._acquire(endpoint)
+            started = False
+            ok = None
+            try:
+                for chunk in endpoint.llm.stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+                ok = True
+            except Exception as e:
+                ok = False
+                # Tokens already reached the caller; switching hosts would duplicate text
+                if started:
+                    raise
+                last_error = e
+                continue
+            finally:
+                self._release(endpoint, ok)
+            return
+        raise last_error
+
+    # Same routing and failover over each host's async client, for the ASGI server
+    async def ainvoke(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AIMessage:
+        last_error = None
+        for endpoint in self._candidates():
+            self._acquire(endpoint)
+            ok = None
+            try:
+                result = await endpoint.llm.ainvoke(input, config, **kwargs)
+                ok = True
+            except Exception as e:
+                ok = False
+                last_error = e
+                continue
+            finally:
+                self._release(endpoint, ok)
+            return result
+        raise last_error
+
+    async def astream(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        last_error = None
+        for endpoint in self._candidates():
+            self._acquire(endpoint)
+            started = False
+            ok = None
+            try:
+                async for chunk in endpoint.llm.astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+                ok = True
+            except Exception as e:
+                ok = False
+                if started:
+                    raise
+                last_error = e
+                continue
+            finally:
+                self._release(endpoint, ok)
+            return
+        raise last_error
+
+    #Routing
+    def _candidates(self) -> List[OllamaEndpoint]:
+        """Endpoints in the order they should be tried for one call."""
+        now = time.time()
+        with self._lock:
+            start = next(self._rotation) % len(self.endpoints)
+            rotated = self.endpoints[start:] + self.endpoints[:start]
+            healthy = [e for e in rotated if e.healthy(now)]
+            unhealthy = [e for e in rotated if not e.healthy(now)]
+            if self.routing == "least_outstanding":
+                # sorted() is stable, so equal loads keep round-robin order
+                healthy.sort(key=lambda e: e.outstanding)
+        # Unhealthy hosts stay as a last resort rather than failing outright
+        return healthy + unhealthy
+
+    def _acquire(self, endpoint: OllamaEndpoint) -> None:
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+    def _release(self, endpoint: OllamaEndpoint, ok: Optional[bool]) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok is None:
+                return
+            if ok:
+                endpoint.consecutive_failures = 0
+                endpoint.unhealthy_until = 0.0
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.unhealthy_until = time.time() + self.cooldown_seconds
+
+    def warm_up(self, options: Optional[Dict[str, Any]] = None) -> None:
+        """Load the model on every host (one-token completion); raises if none of them answered."""
+        errors = []
+        for endpoint in self.endpoints:
+            try:
+                endpoint.llm.invoke("Reply with OK.", options=options or {"num_predict": 1})
+            except Exception as e:
+                errors.append(f"{endpoint.base_url}: {e}")
+        if len(errors) == len(self.endpoints):
+            raise RuntimeError("; ".join(errors))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+
+def canned_completion(text: str) -> str:
+    """Deterministic answers keyed on which ResumeAIAgent prompt is being asked."""
+    if "=== ENTRY <number> ===" in text:
+        # The rules line mentions the marker once; every other occurrence is an entry
+        count = text.count("=== ENTRY ") - 1
+        body = "- Delivered results\n- Improved systems\n- Led efforts" if "bullet points" in text else "Built a useful tool."
+        return "\n".join(f"=== ENTRY {i} ===\n{body}" for i in range(1, count + 1))
+    if "bullet points" in text:
+        return "- Delivered results\n- Improved systems\n- Led efforts"
+    if "Organize the following skills" in text:
+        return "Programming Languages: Python, Go, SQL\nFrameworks/Tools: Docker, Kubernetes, Flask\nSoft Skills: Communication, Leadership"
+    if "professional summary" in text:
+        return "Seasoned engineer delivering reliable systems. Known for leadership and clear communication."
+    return "Built a useful tool that automates routine work."
+
+
+class FakeLLM(Runnable):
+    """In-process stand-in for ChatOllama: no network, deterministic output."""
+
+    def __init__(self, responder: Callable[[str], str] = canned_completion, latency: float = 0.0, model: str = "fake"):
+        self.responder = responder
+        self.latency = latency
+        self.model = model
+        self.temperature = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AIMessage:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return AIMessage(content=self.responder(input.to_string() if hasattr(input, "to_string") else str(input)))
+
+    def stream(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        content = self.invoke(input, config, **kwargs).content
+        # Word-sized chunks so streaming consumers see more than one event
+        for word in content.split(" "):
+            yield AIMessageChunk(content=word + " ")
+
+    # Latency is awaited rather than slept, so the async path holds no thread while "generating"
+    async def ainvoke(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AIMessage:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return AIMessage(content=self.responder(input.to_string() if hasattr(input, "to_string") else str(input)))
+
+    async def astream(self, input: Any, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncIterator[AIMessageChunk]:
+        content = (await self.ainvoke(input, config, **kwargs)).content
+        for word in content.split(" "):
+            yield AIMessageChunk(content=word + " ")
@@ -0,0 +1,378 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM completions.
+
+    Tier 1 is an in-process LRU with a size cap and TTL. Tier 2 is an optional
+    SQLite file that survives restarts and can be shared by several workers;
+    every SWEEP_EVERY writes it drops expired rows and trims to max_disk_entries.
+    """
+
+    SWEEP_EVERY = 64
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600, db_path: Optional[str] = None,
+                 max_disk_entries: int = 10000):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self._writes = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)")
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache (created)")
+
+    @staticmethod
+    def make_key(template: str, inputs: Dict[str, Any], model: str, temperature: float,
+                 options: Optional[Dict[str, Any]] = None) -> str:
+        """options: generation options (num_predict, stop, num_ctx, ...) that change the completion."""
+        payload = json.dumps(
+            {"template": template, "inputs": inputs, "model": model, "temperature": temperature, "options": options or {}},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value, now)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._writes += 1
+            sweep = self._writes % self.SWEEP_EVERY == 1
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO llm_cache (key, value, created) VALUES (?, ?, ?)", (key, value, now))
+                if sweep:
+                    self._sweep(conn, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    #Helpers
+    def _remember(self, key: str, value: str, now: float) -> None:
+        # Caller holds the lock
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _sweep(self, conn: sqlite3.Connection, now: float) -> None:
+        # Expired rows are never read again; past the cap the oldest go first
+        conn.execute("DELETE FROM llm_cache WHERE created <= ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def _disk_get(self, key: str, now: float) -> Optional[str]:
+        if not self.db_path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] + self.ttl_seconds <= now:
+            return None
+        return row[0]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps this safe across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+class _Flight:
+    def __init__(self):
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+        # One entry per caller still waiting; the last one out stops a running stream
+        self.members = []
+        self.stop = False
+        self.cond = threading.Condition()
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls: the first caller for a key starts the work,
+    later callers with the same key wait and share its result (or its exception).
+    Keys are only held while the call runs; completed results belong in LLMCache.
+
+    Every caller passes a `member` (the agent uses its request deadline); fn/produce
+    get the live list of members of the callers still waiting.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[List[Any]], Any], on_join: Optional[Callable[[], None]] = None,
+           member: Any = None) -> Any:
+        flight, leader = self._join(key, on_join, member)
+        try:
+            if leader:
+                try:
+                    flight.result = fn(flight.members)
+                except BaseException as e:
+                    flight.error = e
+                finally:
+                    self._finish(key, flight)
+            else:
+                with flight.cond:
+                    flight.cond.wait_for(lambda: flight.done)
+        finally:
+            self._leave(key, flight, member)
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stream(self, key: str, produce: Callable[[List[Any]], Iterator[str]],
+               on_join: Optional[Callable[[], None]] = None, member: Any = None) -> Iterator[str]:
+        """
+        Like do() for a chunk generator. It runs in a thread of its own, so any caller may
+        stop consuming: each one replays the chunks seen so far and then follows live, and
+        the generator is only closed when the last caller has gone.
+        """
+        flight, leader = self._join(key, on_join, member)
+        if leader:
+            pump = threading.Thread(target=contextvars.copy_context().run, args=(self._pump, key, flight, produce),
+                                    name="single-flight", daemon=True)
+            pump.start()
+
+        try:
+            seen = 0
+            while True:
+                with flight.cond:
+                    flight.cond.wait_for(lambda: flight.done or len(flight.chunks) > seen)
+                    pending = flight.chunks[seen:]
+                    done = flight.done
+                seen += len(pending)
+                yield from pending
+                if done:
+                    break
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            self._leave(key, flight, member)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    #Helpers
+    def _join(self, key: str, on_join: Optional[Callable[[], None]], member: Any):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+            flight.members.append(member)
+        if not leader and on_join is not None:
+            on_join()
+        return flight, leader
+
+    def _leave(self, key: str, flight: _Flight, member: Any) -> None:
+        with self._lock:
+            flight.members.remove(member)
+            if not flight.members and not flight.done:
+                # Nobody is waiting any more: stop the generation, and let a new caller start afresh
+                flight.stop = True
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def _pump(self, key: str, flight: _Flight, produce: Callable[[List[Any]], Iterator[str]]) -> None:
+        chunks = produce(flight.members)
+        try:
+            for chunk in chunks:
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+                if flight.stop:
+                    break
+        except BaseException as e:
+            flight.error = e
+        finally:
+            # Closing a model stream ends its HTTP request
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self._finish(key, flight)
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.cond:
+            flight.done = True
+            flight.cond.notify_all()
+
+
+class _AsyncFlight:
+    def __init__(self):
+        self.chunks = []
+        self.error = None
+        self.done = False
+        self.members = []
+        self.task = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # Wake current waiters; later ones wait on a fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines sharing one event loop. The shared work runs as a
+    task of its own that callers await; it is cancelled when the last of them stops
+    waiting. No lock is needed because nothing here awaits between checking and
+    updating the flight tables.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._streams = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[List[Any]], Awaitable[Any]], on_join: Optional[Callable[[], None]] = None,
+                 member: Any = None) -> Any:
+        flight = self._calls.get(key)
+        if flight is None:
+            flight = self._calls[key] = _AsyncFlight()
+            flight.task = asyncio.ensure_future(fn(flight.members))
+            flight.task.add_done_callback(lambda done: self._finished(self._calls, key, flight))
+        else:
+            self._joined(on_join)
+        flight.members.append(member)
+        try:
+            # One caller going away must not cancel the generation the others wait on
+            return await asyncio.shield(flight.task)
+        finally:
+            self._leave(self._calls, key, flight, member)
+
+    async def stream(self, key: str, produce: Callable[[List[Any]], AsyncIterator[str]],
+                     on_join: Optional[Callable[[], None]] = None, member: Any = None) -> AsyncIterator[str]:
+        """Like SingleFlight.stream(): callers replay the chunks seen so far, then follow live."""
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = self._streams[key] = _AsyncFlight()
+            flight.task = asyncio.ensure_future(self._pump(key, flight, produce))
+        else:
+            self._joined(on_join)
+        flight.members.append(member)
+        try:
+            seen = 0
+            while True:
+                changed = flight.changed
+                pending = flight.chunks[seen:]
+                seen += len(pending)
+                for chunk in pending:
+                    yield chunk
+                if flight.done and seen == len(flight.chunks):
+                    break
+                if not pending:
+                    await changed.wait()
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            self._leave(self._streams, key, flight, member)
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    #Helpers
+    async def _pump(self, key: str, flight: _AsyncFlight, produce: Callable[[List[Any]], AsyncIterator[str]]) -> None:
+        try:
+            async for chunk in produce(flight.members):
+                flight.chunks.append(chunk)
+                flight.notify()
+        except BaseException as e:
+            # Cancelled means every caller left; otherwise they all get the error
+            flight.error = e
+        finally:
+            self._finished(self._streams, key, flight)
+
+    def _leave(self, flights: Dict[str, _AsyncFlight], key: str, flight: _AsyncFlight, member: Any) -> None:
+        flight.members.remove(member)
+        if not flight.members and not flight.task.done():
+            # Cancelling the model call closes its HTTP request, which stops the generation in Ollama
+            flight.task.cancel()
+            if flights.get(key) is flight:
+                del flights[key]
+
+    def _finished(self, flights: Dict[str, _AsyncFlight], key: str, flight: _AsyncFlight) -> None:
+        if flights.get(key) is flight:
+            del flights[key]
+        flight.done = True
+        flight.notify()
+        # Every caller may have stopped waiting (request deadlines); don't log the error as unretrieved
+        if flight.task.done() and not flight.task.cancelled():
+            flight.task.exception()
+
+    def _joined(self, on_join: Optional[Callable[[], None]]) -> None:
+        self.coalesced += 1
+        if on_join is not None:
+            on_join()
@@ -0,0 +1,227 @@
+"""
+Minimal Prometheus-compatible metrics (counters and histograms with labels).
+
+Kept in-repo rather than pulling in prometheus_client: everything here is
+process-local and rendered by /metrics in the text exposition format.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+RATE_BUCKETS = (1, 5, 10, 20, 40, 80, 160, 320)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            # [per-bucket counts, sum, count]
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, (('le', repr(float(bound))),))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        metric = Counter(name, documentation)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- HTTP ---
+HTTP_REQUESTS = REGISTRY.counter("resume_http_requests_total", "HTTP requests by endpoint, method and status.")
+HTTP_ERRORS = REGISTRY.counter("resume_http_errors_total", "HTTP responses with a 5xx status.")
+HTTP_LATENCY = REGISTRY.histogram("resume_http_request_seconds", "HTTP request latency until the response is returned.")
+
+# --- Agent ---
+AGENT_CALLS = REGISTRY.counter("resume_ai_calls_total", "ResumeAIAgent method calls.")
+AGENT_ERRORS = REGISTRY.counter("resume_ai_errors_total", "ResumeAIAgent method calls that raised.")
+AGENT_LATENCY = REGISTRY.histogram("resume_ai_call_seconds", "ResumeAIAgent method latency.")
+AGENT_STAGE_LATENCY = REGISTRY.histogram("resume_ai_stage_seconds", "Per-section latency of prompt_build, llm_wait, parse and safety_net.")
+AGENT_COALESCED = REGISTRY.counter("resume_ai_coalesced_total", "LLM calls that joined an identical in-flight generation instead of starting one.")
+AGENT_REUSED = REGISTRY.counter("resume_ai_reused_total", "Sections or entries copied from a previous result because their inputs were unchanged.")
+AGENT_FALLBACKS = REGISTRY.counter("resume_ai_fallbacks_total", "Safety-net fallback text used instead of the model output.")
+MODEL_CALLS = REGISTRY.counter("resume_ai_model_calls_total", "LLM completions by section and model.")
+AGENT_DEGRADED = REGISTRY.counter("resume_ai_degraded_total", "Sections or entries given safety-net text because the request deadline ran out.")
+AGENT_ESCALATIONS = REGISTRY.counter("resume_ai_escalations_total", "Routed-model outputs that failed validation and were regenerated on the main model.")
+SKILLS_CATEGORIZED = REGISTRY.counter("resume_ai_skills_categorized_total", "Skills categorized by the local taxonomy or sent to the model.")
+AGENT_DONE_REASON = REGISTRY.counter("resume_ai_done_reason_total", "Why Ollama ended a completion: stop (natural end or stop sequence) or length (num_predict budget).")
+PROMPT_TOKENS = REGISTRY.counter("resume_ai_prompt_tokens_total", "Prompt tokens reported by Ollama.")
+COMPLETION_TOKENS = REGISTRY.counter("resume_ai_completion_tokens_total", "Completion tokens reported by Ollama.")
+COMPLETION_TOKENS_PER_CALL = REGISTRY.histogram("resume_ai_completion_tokens", "Completion tokens per LLM call.", TOKEN_BUCKETS)
+TOKENS_PER_SECOND = REGISTRY.histogram("resume_ai_tokens_per_second", "Ollama generation speed (eval_count / eval_duration).", RATE_BUCKETS)
+
+# --- Rendering ---
+RENDER_LATENCY = REGISTRY.histogram("resume_render_seconds", "ReportLab / python-docx render time.")
+RENDER_BYTES = REGISTRY.histogram("resume_render_bytes", "Rendered document size.", BYTES_BUCKETS)
+RENDER_CACHE = REGISTRY.counter("resume_render_cache_total", "Rendered-document cache lookups by result.")
+RENDER_FIT = REGISTRY.counter("resume_render_fit_total", "Fit-to-pages renders by whether the content fit.")
+
+
+def instrument(method: str):
+    """Count calls, errors and latency of an agent method; (async) generator methods are timed until exhausted."""
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                AGENT_CALLS.inc(method=method)
+                start = time.perf_counter()
+                try:
+                    return (yield from fn(*args, **kwargs))
+                except Exception:
+                    AGENT_ERRORS.inc(method=method)
+                    raise
+                finally:
+                    AGENT_LATENCY.observe(time.perf_counter() - start, method=method)
+            return generator_wrapper
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def async_generator_wrapper(*args, **kwargs):
+                AGENT_CALLS.inc(method=method)
+                start = time.perf_counter()
+                try:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                except Exception:
+                    AGENT_ERRORS.inc(method=method)
+                    raise
+                finally:
+                    AGENT_LATENCY.observe(time.perf_counter() - start, method=method)
+            return async_generator_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                AGENT_CALLS.inc(method=method)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    AGENT_ERRORS.inc(method=method)
+                    raise
+                finally:
+                    AGENT_LATENCY.observe(time.perf_counter() - start, method=method)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            AGENT_CALLS.inc(method=method)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                AGENT_ERRORS.inc(method=method)
+                raise
+            finally:
+                AGENT_LATENCY.observe(time.perf_counter() - start, method=method)
+        return wrapper
+    return decorator
+
+
+def record_usage(message: Any, section: str) -> None:
+    """Pull token counts and generation speed from an Ollama AIMessage, when present."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    metadata = getattr(message, "response_metadata", None) or {}
+
+    prompt_tokens = usage.get("input_tokens", metadata.get("prompt_eval_count"))
+    completion_tokens = usage.get("output_tokens", metadata.get("eval_count"))
+    if prompt_tokens:
+        PROMPT_TOKENS.inc(prompt_tokens, section=section)
+    if completion_tokens:
+        COMPLETION_TOKENS.inc(completion_tokens, section=section)
+        COMPLETION_TOKENS_PER_CALL.observe(completion_tokens, section=section)
+
+    if metadata.get("done_reason"):
+        AGENT_DONE_REASON.inc(section=section, reason=metadata["done_reason"])
+
+    eval_count, eval_duration = metadata.get("eval_count"), metadata.get("eval_duration")
+    if eval_count and eval_duration:
+        TOKENS_PER_SECOND.observe(eval_count / (eval_duration / 1e9), section=section)
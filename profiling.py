@@ -0,0 +1,215 @@
+"""
+Opt-in profiling of single requests.
+
+app.py and asgi.py start a Capture for a request that carries the privileged
+X-Profile header or is picked by the sampling rate. While it runs, every thread
+working for that request is profiled with cProfile: the request thread itself,
+plus the agent's and renderer's pool jobs, which call run() with the request's
+context. tracemalloc traces allocations for the same window. When the response
+has been sent, everything is written to <directory>/<request id>/:
+
+    profile.pstats        merged cProfile stats (python -m pstats, snakeviz, ...)
+    profile.txt           top functions by cumulative time
+    allocations.txt       allocation sites that grew the most during the request
+    allocations.snapshot  tracemalloc snapshot at the end (tracemalloc.Snapshot.load)
+    request.json          method, path, status, duration and threads profiled
+
+cProfile and tracemalloc are process-wide hooks, so concurrent requests can leak
+into a capture: allocations always, and on the ASGI server the event loop's profile
+includes whatever else the loop ran meanwhile. From Python 3.12 a single profiler
+on the request thread records every thread, and only one capture at a time gets a
+profile; the others still record allocations.
+"""
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional
+
+
+_current = contextvars.ContextVar("resume_profile", default=None)
+_local = threading.local()
+
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+TRACEMALLOC_FRAMES = 10
+TOP_FUNCTIONS = 80
+TOP_ALLOCATIONS = 40
+# cProfile moved onto sys.monitoring in 3.12: one active profiler per process, seeing all threads
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+# tracemalloc is global: keep it on while any capture needs it, and leave it alone
+# if something else started it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+class Capture:
+    def __init__(self, request_id: Optional[str], directory: str, trigger: str, keep: int = 200):
+        # Client-supplied ids become directory names; anything unusual gets a fresh one
+        if not request_id or not REQUEST_ID_PATTERN.fullmatch(request_id) or request_id.strip(".") == "":
+            request_id = uuid.uuid4().hex
+        self.request_id = request_id
+        self.directory = directory
+        self.trigger = trigger
+        self.keep = keep
+        self.threads = 0
+        self._stats = None
+        self._lock = threading.Lock()
+        self._main = None
+        self._before = None
+        self._started = None
+        self._started_at = None
+        self._seconds = None
+
+    def start(self) -> "Capture":
+        """Begin capturing on the calling thread; pool jobs join through run()."""
+        self._started = time.perf_counter()
+        self._started_at = datetime.now().isoformat()
+        _start_tracing()
+        self._before = tracemalloc.take_snapshot()
+        _current.set(self)
+        self._main = self._enable(main=True)
+        return self
+
+    def stop(self) -> None:
+        """Stop profiling the thread that called start(); must run on that thread. finish() does it if needed."""
+        if self._main is not None:
+            self._disable(self._main)
+            self._main = None
+        if self._seconds is None:
+            self._seconds = time.perf_counter() - self._started
+            _current.set(None)
+
+    def finish(self, **details: Any) -> str:
+        """Stop capturing and write the files; returns their directory."""
+        self.stop()
+        after = tracemalloc.take_snapshot()
+        _stop_tracing()
+
+        path = os.path.join(self.directory, self.request_id)
+        os.makedirs(path, exist_ok=True)
+        self._write_profile(path)
+        self._write_allocations(path, after)
+        with open(os.path.join(path, "request.json"), "w") as f:
+            json.dump({
+                "requestId": self.request_id,
+                "trigger": self.trigger,
+                "started": self._started_at,
+                "seconds": round(self._seconds, 6),
+                "threadsProfiled": self.threads,
+                "pid": os.getpid(),
+                "python": sys.version.split()[0],
+                **details,
+            }, f, indent=2)
+        self._prune()
+        return path
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile the calling thread into this capture for the duration of the block."""
+        profiler = self._enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                self._disable(profiler)
+
+    #Helpers
+    def _enable(self, main: bool = False) -> Optional[cProfile.Profile]:
+        # One profiler per thread: a thread already feeding a capture just keeps doing so.
+        # From 3.12 the request thread's profiler already sees every thread, and only one may run at once.
+        if getattr(_local, "profiling", False) or (PROCESS_WIDE_PROFILER and not main):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another capture (or profiling tool) holds the process-wide profiler; go without
+            return None
+        _local.profiling = True
+        return profiler
+
+    def _disable(self, profiler: cProfile.Profile) -> None:
+        profiler.disable()
+        _local.profiling = False
+        profiler.create_stats()
+        with self._lock:
+            self.threads += 1
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+
+    def _write_profile(self, path: str) -> None:
+        with self._lock:
+            stats = self._stats
+        if stats is None:
+            return
+        stats.dump_stats(os.path.join(path, "profile.pstats"))
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        with open(os.path.join(path, "profile.txt"), "w") as f:
+            f.write(report.getvalue())
+
+    def _write_allocations(self, path: str, after: tracemalloc.Snapshot) -> None:
+        # Leave out the capture's own bookkeeping
+        noise = [tracemalloc.Filter(False, module.__file__) for module in (tracemalloc, cProfile, pstats, sys.modules[__name__])]
+        after = after.filter_traces(noise)
+        after.dump(os.path.join(path, "allocations.snapshot"))
+        growth = after.compare_to(self._before.filter_traces(noise), "lineno")
+        with open(os.path.join(path, "allocations.txt"), "w") as f:
+            total = sum(stat.size_diff for stat in growth)
+            f.write(f"Net growth during the request: {total / 1024:.1f} KiB\n\n")
+            for stat in growth[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+    def _prune(self) -> None:
+        entries = [entry for entry in os.scandir(self.directory) if entry.is_dir()]
+        if len(entries) > self.keep:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.keep]:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def run(fn: Callable[..., Any], *args: Any) -> Any:
+    """Call fn(*args), profiled into the active capture if there is one. For pool jobs, under the request's context."""
+    capture = _current.get()
+    if capture is None:
+        return fn(*args)
+    with capture.thread():
+        return fn(*args)
+
+
+def current() -> Optional[Capture]:
+    return _current.get()
+
+
+def _start_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
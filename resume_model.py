@@ -0,0 +1,172 @@
+"""
+Typed resume payload, validated and normalized once at the API boundary.
+
+Anything malformed raises ResumeValidationError (mapped to HTTP 400 in app.py)
+before a request can reach Ollama or ReportLab.
+"""
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List
+
+
+MAX_SHORT_FIELD = 300
+MAX_LONG_FIELD = 5000
+MAX_ENTRIES = 50
+MAX_SKILLS = 200
+
+
+class ResumeValidationError(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass(slots=True)
+class PersonalInfo:
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+    github: str = ""
+
+
+@dataclass(slots=True)
+class ExperienceEntry:
+    jobTitle: str = ""
+    company: str = ""
+    duration: str = ""
+    description: str = ""
+
+
+@dataclass(slots=True)
+class EducationEntry:
+    degree: str = ""
+    institution: str = ""
+    year: str = ""
+
+
+@dataclass(slots=True)
+class ProjectEntry:
+    title: str = ""
+    description: str = ""
+    technologies: str = ""
+
+
+@dataclass(slots=True)
+class CertificationEntry:
+    title: str = ""
+    organization: str = ""
+    year: str = ""
+
+
+@dataclass(slots=True)
+class Resume:
+    personalInfo: PersonalInfo = field(default_factory=PersonalInfo)
+    summary: str = ""
+    skills: List[str] = field(default_factory=list)
+    experience: List[ExperienceEntry] = field(default_factory=list)
+    education: List[EducationEntry] = field(default_factory=list)
+    projects: List[ProjectEntry] = field(default_factory=list)
+    certifications: List[CertificationEntry] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-shaped dict with every key present, as the agent and templates expect."""
+        return asdict(self)
+
+
+# Per-field length limits; anything not listed is a short field
+LONG_FIELDS = {"summary", "description"}
+
+
+def _text(value: Any, path: str, errors: List[str]) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        errors.append(f"{path} must be a string")
+        return ""
+    text = str(value).strip()
+    limit = MAX_LONG_FIELD if path.rsplit(".", 1)[-1] in LONG_FIELDS else MAX_SHORT_FIELD
+    if len(text) > limit:
+        errors.append(f"{path} is longer than {limit} characters")
+    return text
+
+
+def _record(cls, value: Any, path: str, errors: List[str]):
+    if value is None:
+        return cls()
+    if not isinstance(value, dict):
+        errors.append(f"{path} must be an object")
+        return cls()
+    return cls(**{name: _text(value.get(name), f"{path}.{name}", errors) for name in cls.__dataclass_fields__})
+
+
+def _records(cls, value: Any, path: str, errors: List[str]) -> list:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        errors.append(f"{path} must be a list")
+        return []
+    if len(value) > MAX_ENTRIES:
+        errors.append(f"{path} has more than {MAX_ENTRIES} entries")
+        return []
+    return [_record(cls, item, f"{path}[{i}]", errors) for i, item in enumerate(value)]
+
+
+def _skills(value: Any, path: str, errors: List[str]) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        errors.append(f"{path} must be a list of strings")
+        return []
+    if len(value) > MAX_SKILLS:
+        errors.append(f"{path} has more than {MAX_SKILLS} entries")
+        return []
+    skills = [_text(skill, f"{path}[{i}]", errors) for i, skill in enumerate(value)]
+    return [skill for skill in skills if skill]
+
+
+def parse_resume(payload: Any, path: str = "data") -> Resume:
+    """Validate and normalize a full resume payload."""
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            raise ResumeValidationError([f"{path} is not valid JSON"])
+    if not isinstance(payload, dict):
+        raise ResumeValidationError([f"{path} must be an object"])
+
+    errors = []
+    resume = Resume(
+        personalInfo=_record(PersonalInfo, payload.get("personalInfo"), f"{path}.personalInfo", errors),
+        summary=_text(payload.get("summary"), f"{path}.summary", errors),
+        skills=_skills(payload.get("skills"), f"{path}.skills", errors),
+        experience=_records(ExperienceEntry, payload.get("experience"), f"{path}.experience", errors),
+        education=_records(EducationEntry, payload.get("education"), f"{path}.education", errors),
+        projects=_records(ProjectEntry, payload.get("projects"), f"{path}.projects", errors),
+        certifications=_records(CertificationEntry, payload.get("certifications"), f"{path}.certifications", errors),
+    )
+    if errors:
+        raise ResumeValidationError(errors)
+    return resume
+
+
+def parse_section(payload: Any, section: str) -> List[Any]:
+    """Validate one list section of a request body ({"experience": [...]}) and return plain dicts."""
+    if not isinstance(payload, dict):
+        raise ResumeValidationError(["request body must be a JSON object"])
+    errors = []
+    if section == "skills":
+        items = _skills(payload.get("skills"), "skills", errors)
+    else:
+        cls = {
+            "experience": ExperienceEntry,
+            "education": EducationEntry,
+            "projects": ProjectEntry,
+            "certifications": CertificationEntry,
+        }[section]
+        items = [asdict(item) for item in _records(cls, payload.get(section), section, errors)]
+    if errors:
+        raise ResumeValidationError(errors)
+    return items
@@ -0,0 +1,235 @@
+"""
+Local skill taxonomy: categorize and dedupe common skills without asking the LLM.
+
+Lookups fold case, whitespace and punctuation ("Node.JS", "nodejs", "node js"
+are the same key) and know common aliases ("golang" -> "Go"). Only skills the
+index doesn't know are left for ResumeAIAgent to send to Ollama.
+"""
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+PROGRAMMING_LANGUAGES = "Programming Languages"
+FRAMEWORKS_TOOLS = "Frameworks/Tools"
+SOFT_SKILLS = "Soft Skills"
+CATEGORIES = (PROGRAMMING_LANGUAGES, FRAMEWORKS_TOOLS, SOFT_SKILLS)
+
+# category -> canonical name -> aliases (the canonical name is always an alias of itself)
+DEFAULT_SKILLS = {
+    PROGRAMMING_LANGUAGES: {
+        "Python": ["py", "python3", "python 3"],
+        "JavaScript": ["js", "ecmascript", "es6"],
+        "TypeScript": ["ts"],
+        "Java": ["java se", "java ee"],
+        "C": ["c language", "ansi c"],
+        "C++": ["cpp", "c plus plus"],
+        "C#": ["csharp", "c sharp"],
+        "Go": ["golang"],
+        "Rust": ["rustlang"],
+        "Ruby": [],
+        "PHP": [],
+        "Swift": [],
+        "Kotlin": [],
+        "Scala": [],
+        "R": ["r language", "rlang"],
+        "MATLAB": [],
+        "Perl": [],
+        "Dart": [],
+        "Elixir": [],
+        "Haskell": [],
+        "Lua": [],
+        "Julia": [],
+        "Objective-C": ["objc", "obj c"],
+        "SQL": ["structured query language"],
+        "PL/SQL": ["plsql"],
+        "Bash": ["bash scripting"],
+        "Shell Scripting": ["shell"],
+        "PowerShell": [],
+        "HTML": ["html5"],
+        "CSS": ["css3"],
+        "Solidity": [],
+        "Assembly": ["asm"],
+        "VBA": ["visual basic for applications"],
+    },
+    FRAMEWORKS_TOOLS: {
+        "React": ["reactjs", "react js", "react.js"],
+        "React Native": [],
+        "Angular": ["angularjs", "angular js"],
+        "Vue.js": ["vue", "vuejs"],
+        "Svelte": [],
+        "Next.js": ["nextjs"],
+        "Node.js": ["node", "nodejs"],
+        "Express": ["expressjs", "express js"],
+        "Django": [],
+        "Flask": [],
+        "FastAPI": [],
+        "Spring": ["spring framework"],
+        "Spring Boot": ["springboot"],
+        "Ruby on Rails": ["rails", "ror"],
+        "Laravel": [],
+        ".NET": ["dotnet", "dot net", ".net core", "asp.net", "aspnet"],
+        "Flutter": [],
+        "jQuery": [],
+        "Bootstrap": [],
+        "Tailwind CSS": ["tailwind", "tailwindcss"],
+        "GraphQL": [],
+        "REST APIs": ["rest", "rest api", "restful", "restful apis"],
+        "gRPC": [],
+        "TensorFlow": [],
+        "PyTorch": ["torch"],
+        "Keras": [],
+        "scikit-learn": ["sklearn", "scikit learn"],
+        "Pandas": [],
+        "NumPy": [],
+        "SciPy": [],
+        "Matplotlib": [],
+        "Spark": ["apache spark", "pyspark"],
+        "Hadoop": [],
+        "Kafka": ["apache kafka"],
+        "Airflow": ["apache airflow"],
+        "LangChain": [],
+        "Docker": [],
+        "Kubernetes": ["k8s"],
+        "Terraform": [],
+        "Ansible": [],
+        "Jenkins": [],
+        "GitHub Actions": [],
+        "GitLab CI": ["gitlab ci/cd"],
+        "CI/CD": ["ci cd", "cicd", "continuous integration"],
+        "Git": [],
+        "GitHub": [],
+        "GitLab": [],
+        "Linux": [],
+        "Unix": [],
+        "AWS": ["amazon web services"],
+        "Azure": ["microsoft azure"],
+        "Google Cloud": ["gcp", "google cloud platform"],
+        "Firebase": [],
+        "PostgreSQL": ["postgres", "postgre sql"],
+        "MySQL": [],
+        "SQLite": [],
+        "MongoDB": ["mongo"],
+        "Redis": [],
+        "Elasticsearch": ["elastic search"],
+        "DynamoDB": [],
+        "Oracle Database": ["oracle", "oracle db"],
+        "SQL Server": ["mssql", "microsoft sql server"],
+        "Nginx": [],
+        "Jira": [],
+        "Figma": [],
+        "Tableau": [],
+        "Power BI": ["powerbi"],
+        "Excel": ["microsoft excel", "ms excel"],
+        "Selenium": [],
+        "Jest": [],
+        "Pytest": [],
+        "JUnit": [],
+        "Postman": [],
+        "Webpack": [],
+        "Unity": [],
+        "Prometheus": [],
+        "Grafana": [],
+    },
+    SOFT_SKILLS: {
+        "Communication": ["communication skills", "verbal communication", "written communication"],
+        "Teamwork": ["team work", "team player"],
+        "Collaboration": [],
+        "Leadership": ["team leadership"],
+        "Problem Solving": ["problem-solving", "problem solving skills"],
+        "Critical Thinking": [],
+        "Adaptability": [],
+        "Time Management": [],
+        "Project Management": [],
+        "Attention to Detail": ["detail oriented", "detail-oriented"],
+        "Creativity": [],
+        "Mentoring": ["mentorship"],
+        "Public Speaking": ["presentation skills", "presentations"],
+        "Negotiation": [],
+        "Conflict Resolution": [],
+        "Decision Making": ["decision-making"],
+        "Stakeholder Management": [],
+        "Customer Service": [],
+        "Agile": ["agile methodologies", "agile methodology"],
+        "Scrum": [],
+        "Self-Motivation": ["self motivated", "self-motivated"],
+        "Emotional Intelligence": [],
+        "Analytical Thinking": ["analytical skills"],
+    },
+}
+
+# Keep "+" and "#" so C, C++ and C# stay apart; everything else non-alphanumeric is dropped
+_FOLD = re.compile(r"[^a-z0-9+#]")
+
+
+def fold(skill: str) -> str:
+    return _FOLD.sub("", skill.lower())
+
+
+class SkillTaxonomy:
+    def __init__(self, skills: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        self._index: Dict[str, Tuple[str, str]] = {}
+        self.add(DEFAULT_SKILLS if skills is None else skills)
+
+    @classmethod
+    def from_json(cls, path: str) -> "SkillTaxonomy":
+        """Defaults plus a JSON file shaped like DEFAULT_SKILLS."""
+        taxonomy = cls()
+        with open(path, encoding="utf-8") as f:
+            taxonomy.add(json.load(f))
+        return taxonomy
+
+    def add(self, skills: Dict[str, Dict[str, List[str]]]) -> None:
+        for category, entries in skills.items():
+            for canonical, aliases in entries.items():
+                for alias in [canonical, *aliases]:
+                    self._index[fold(alias)] = (canonical, category)
+
+    def lookup(self, skill: str) -> Optional[Tuple[str, str]]:
+        """(canonical name, category) for a known skill, else None."""
+        return self._index.get(fold(skill))
+
+    def categorize(self, skills: List[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+        """
+        Split skills into ({category: [canonical names]}, [unknown skills]).
+        Input order is kept and duplicates (after folding and aliasing) are dropped.
+        """
+        organized: Dict[str, List[str]] = {}
+        unknown: List[str] = []
+        seen = set()
+        for skill in skills:
+            skill = skill.strip()
+            key = fold(skill)
+            if not key:
+                continue
+            match = self._index.get(key)
+            name = match[0] if match else skill
+            if fold(name) in seen:
+                continue
+            seen.add(fold(name))
+            if match:
+                organized.setdefault(match[1], []).append(name)
+            else:
+                unknown.append(skill)
+        return organized, unknown
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+def merge_categories(*groups: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Merge category dicts in order, standard categories first, dropping repeated skills."""
+    merged: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+    seen = set()
+    for group in groups:
+        for category, skills in group.items():
+            for skill in skills:
+                if fold(skill) and fold(skill) not in seen:
+                    seen.add(fold(skill))
+                    merged.setdefault(category, []).append(skill)
+    return {category: skills for category, skills in merged.items() if skills}
+
+
+def flatten(categories: Dict[str, List[str]]) -> List[str]:
+    """Category order, then order within each category."""
+    return [skill for skills in categories.values() for skill in skills]
@@ -1,136 +1,258 @@
-import streamlit as st
-import requests
-import base64
-
-API_URL = "http://localhost:5000"
-
-st.set_page_config(page_title="AI Resume Builder", layout="wide")
-st.title("📄 AI Resume Builder (Streamlit Test UI)")
-
-# Sidebar for template selection
-template = st.sidebar.selectbox("Choose Template", ["Minimal", "Modern"])
-
-# --- Initialize session state ---
-for key in ["education", "experience", "projects", "resumeData", "pdf_preview"]:
-    if key not in st.session_state:
-        st.session_state[key] = []
-
-# -------------------- Personal Information --------------------
-st.header("Personal Information")
-personal_info = {
-    "name": st.text_input("Full Name"),
-    "email": st.text_input("Email"),
-    "phone": st.text_input("Phone"),
-    "linkedin": st.text_input("LinkedIn"),
-    "github": st.text_input("GitHub"),
-}
-
-# -------------------- Career Summary --------------------
-st.header("Career Summary")
-summary = st.text_area("Summary")
-if st.button("✨ Enhance Summary"):
-    res = requests.post(f"{API_URL}/api/enhance-summary", json={"personalInfo": personal_info, "summary": summary})
-    if res.ok:
-        summary = res.json()["summary"]
-        st.success("Summary enhanced ✅")
-
-# -------------------- Skills --------------------
-st.header("Skills")
-skills = st.text_area("Skills (comma-separated)").split(",")
-if st.button("✨ Enhance Skills"):
-    res = requests.post(f"{API_URL}/api/enhance-skills", json={"skills": skills})
-    if res.ok:
-        skills = res.json()["skills"]
-        st.success("Skills organized ✅")
-
-# -------------------- Education --------------------
-st.header("Education")
-for i, edu in enumerate(st.session_state.education):
-    st.text_input(f"Degree {i+1}", value=edu.get("degree", ""), key=f"degree_{i}")
-    st.text_input(f"Institution {i+1}", value=edu.get("institution", ""), key=f"institution_{i}")
-    st.text_input(f"Year {i+1}", value=edu.get("year", ""), key=f"year_{i}")
-
-if st.button("+ Add Degree"):
-    st.session_state.education.append({"degree": "", "institution": "", "year": ""})
-
-if st.button("✨ Enhance Education"):
-    res = requests.post(f"{API_URL}/api/enhance-education", json={"education": st.session_state.education})
-    if res.ok:
-        st.session_state.education = res.json()["education"]
-        st.success("Education enhanced ✅")
-
-# -------------------- Experience --------------------
-st.header("Work Experience")
-for i, exp in enumerate(st.session_state.experience):
-    st.text_input(f"Job Title {i+1}", value=exp.get("jobTitle", ""), key=f"job_{i}")
-    st.text_input(f"Company {i+1}", value=exp.get("company", ""), key=f"company_{i}")
-    st.text_input(f"Duration {i+1}", value=exp.get("duration", ""), key=f"duration_{i}")
-    st.text_area(f"Description {i+1}", value=exp.get("description", ""), key=f"description_{i}")
-
-if st.button("+ Add Experience"):
-    st.session_state.experience.append({"jobTitle": "", "company": "", "duration": "", "description": ""})
-
-if st.button("✨ Enhance Experience"):
-    res = requests.post(f"{API_URL}/api/enhance-experience", json={"experience": st.session_state.experience})
-    if res.ok:
-        st.session_state.experience = res.json()["experience"]
-        st.success("Experience enhanced ✅")
-
-# -------------------- Projects --------------------
-st.header("Projects")
-for i, proj in enumerate(st.session_state.projects):
-    st.text_input(f"Title {i+1}", value=proj.get("title", ""), key=f"proj_title_{i}")
-    st.text_area(f"Description {i+1}", value=proj.get("description", ""), key=f"proj_desc_{i}")
-    st.text_input(f"Technologies {i+1}", value=proj.get("technologies", ""), key=f"proj_tech_{i}")
-
-if st.button("+ Add Project"):
-    st.session_state.projects.append({"title": "", "description": "", "technologies": ""})
-
-if st.button("✨ Enhance Projects"):
-    res = requests.post(f"{API_URL}/api/enhance-projects", json={"projects": st.session_state.projects})
-    if res.ok:
-        st.session_state.projects = res.json()["projects"]
-        st.success("Projects enhanced ✅")
-
-# -------------------- Resume Assembly --------------------
-resume_data = {
-    "personalInfo": personal_info,
-    "summary": summary,
-    "skills": [s.strip() for s in skills if s.strip()],
-    "education": st.session_state.education,
-    "experience": st.session_state.experience,
-    "projects": st.session_state.projects,
-}
-
-# -------------------- Actions --------------------
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    if st.button("📄 Just Generate Resume"):
-        res = requests.post(f"{API_URL}/generate-resume", json={"data": resume_data, "template": template})
-        if res.ok:
-            st.session_state.resumeData = res.json()["resumeData"]
-            st.success("Resume preview ready ✅")
-
-with col2:
-    if st.button("✨ Enhance with AI"):
-        res = requests.post(f"{API_URL}/api/generate-ai-resume", json={"data": resume_data, "template": template})
-        if res.ok:
-            st.session_state.resumeData = res.json()["data"]
-            st.success("AI-enhanced resume ready ✅")
-
-with col3:
-    if st.button("⬇️ Download PDF"):
-        res = requests.post(f"{API_URL}/download-resume", json={"data": st.session_state.get("resumeData", resume_data), "template": template, "format": "pdf"})
-        if res.ok:
-            st.download_button("Download Resume PDF", res.content, file_name="resume.pdf", mime="application/pdf")
-
-# -------------------- PDF Preview --------------------
-if "resumeData" in st.session_state:
-    st.subheader("📑 Resume Preview (PDF)")
-    res = requests.post(f"{API_URL}/download-resume", json={"data": st.session_state["resumeData"], "template": template, "format": "pdf"})
-    if res.ok:
-        pdf_bytes = res.content
-        base64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
-        pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600" type="application/pdf"></iframe>'
-        st.markdown(pdf_display, unsafe_allow_html=True)
+import streamlit as st
+import streamlit.components.v1 as components
+import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+API_URL = os.environ.get("RESUME_API_URL", "http://localhost:5000")
+# What the browser uses to reach the API (the preview iframe loads from here)
+PUBLIC_API_URL = os.environ.get("RESUME_API_PUBLIC_URL", API_URL)
+RESPONSE_CACHE_SIZE = 32
+
+
+@st.cache_resource
+def api_session():
+    """One keep-alive connection pool shared by every rerun and browser session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def data_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def api_json(path, payload):
+    """
+    POST and return the JSON body, memoized per browser session on (path, payload).
+    Re-clicking a button on unchanged data never reaches the API. Failures and
+    degraded answers (placeholder text after a timeout) aren't cached.
+    """
+    responses = st.session_state.setdefault("responses", OrderedDict())
+    key = data_key(path, payload)
+    if key in responses:
+        responses.move_to_end(key)
+        # Decode per call: callers stash parts of the body in session state and edit them
+        return json.loads(responses[key])
+
+    res = api_session().post(f"{API_URL}{path}", json=payload)
+    if not res.ok:
+        st.error(res.text)
+        return None
+    body = res.json()
+    if body.get("degraded"):
+        warn_degraded(body["degraded"])
+        return body
+    responses[key] = res.text
+    while len(responses) > RESPONSE_CACHE_SIZE:
+        responses.popitem(last=False)
+    return body
+
+
+def warn_degraded(sections):
+    st.warning(f"The AI took too long for: {', '.join(sections)}. Placeholder text was used; try again to regenerate it.")
+
+
+def preview_url(data, template, fit_pages):
+    """
+    Browser URL of the rendered preview. Rendered again when the data changed or the
+    server no longer has it (render cache eviction, restart), which a HEAD tells us.
+    """
+    preview_key = data_key(data, template, fit_pages)
+    path = st.session_state.get("preview_path")
+    if path and st.session_state.get("preview_key") == preview_key:
+        if api_session().head(f"{API_URL}{path}").ok:
+            return f"{PUBLIC_API_URL}{path}"
+
+    res = api_session().post(f"{API_URL}/api/preview", json={"data": data, "template": template, "fitPages": fit_pages})
+    if not res.ok:
+        st.error(res.text)
+        return None
+    st.session_state.preview_key = preview_key
+    st.session_state.preview_path = res.json()["url"]
+    return f"{PUBLIC_API_URL}{st.session_state.preview_path}"
+
+
+def stream_events(path, payload):
+    """Yield Server-Sent Events from a streaming endpoint as dicts."""
+    with api_session().post(f"{API_URL}{path}", json=payload, stream=True) as res:
+        if not res.ok:
+            st.error(res.text)
+            return
+        for line in res.iter_lines(decode_unicode=True):
+            if line and line.startswith("data: "):
+                yield json.loads(line[len("data: "):])
+
+st.set_page_config(page_title="AI Resume Builder", layout="wide")
+st.title("📄 AI Resume Builder (Streamlit Test UI)")
+
+# Sidebar for template selection
+template = st.sidebar.selectbox("Choose Template", ["Minimal", "Modern"])
+# Tighten spacing and type server-side so the PDF stays on one page
+fit_pages = 1 if st.sidebar.checkbox("Fit to one page") else None
+
+# --- Initialize session state ---
+for key in ["education", "experience", "projects", "resumeData"]:
+    if key not in st.session_state:
+        st.session_state[key] = []
+# Last enhance responses, sent back as "previous" so only changed entries hit the LLM
+if "previous" not in st.session_state:
+    st.session_state.previous = {}
+
+# -------------------- Personal Information --------------------
+st.header("Personal Information")
+personal_info = {
+    "name": st.text_input("Full Name"),
+    "email": st.text_input("Email"),
+    "phone": st.text_input("Phone"),
+    "linkedin": st.text_input("LinkedIn"),
+    "github": st.text_input("GitHub"),
+}
+
+# -------------------- Career Summary --------------------
+st.header("Career Summary")
+summary = st.text_area("Summary")
+if st.button("✨ Enhance Summary"):
+    placeholder = st.empty()
+    streamed = ""
+    for event in stream_events("/api/enhance-summary/stream", {"personalInfo": personal_info, "summary": summary}):
+        if event["event"] == "token":
+            streamed += event["text"]
+            placeholder.markdown(streamed)
+        elif event["event"] == "reset":
+            streamed = ""
+        elif event["event"] == "degraded":
+            streamed = ""
+            warn_degraded(["summary"])
+        elif event["event"] == "section":
+            summary = event["result"]
+            placeholder.markdown(summary)
+            st.success("Summary enhanced ✅")
+        elif event["event"] == "error":
+            st.error(event["error"])
+
+# -------------------- Skills --------------------
+st.header("Skills")
+skills = st.text_area("Skills (comma-separated)").split(",")
+if st.button("✨ Enhance Skills"):
+    body = api_json("/api/enhance-skills", {"skills": skills})
+    if body:
+        skills = body["skills"]
+        st.success("Skills organized ✅")
+
+# -------------------- Education --------------------
+st.header("Education")
+for i, edu in enumerate(st.session_state.education):
+    st.text_input(f"Degree {i+1}", value=edu.get("degree", ""), key=f"degree_{i}")
+    st.text_input(f"Institution {i+1}", value=edu.get("institution", ""), key=f"institution_{i}")
+    st.text_input(f"Year {i+1}", value=edu.get("year", ""), key=f"year_{i}")
+
+if st.button("+ Add Degree"):
+    st.session_state.education.append({"degree": "", "institution": "", "year": ""})
+
+if st.button("✨ Enhance Education"):
+    body = api_json("/api/enhance-education", {"education": st.session_state.education})
+    if body:
+        st.session_state.education = body["education"]
+        st.success("Education enhanced ✅")
+
+# -------------------- Experience --------------------
+st.header("Work Experience")
+for i, exp in enumerate(st.session_state.experience):
+    st.text_input(f"Job Title {i+1}", value=exp.get("jobTitle", ""), key=f"job_{i}")
+    st.text_input(f"Company {i+1}", value=exp.get("company", ""), key=f"company_{i}")
+    st.text_input(f"Duration {i+1}", value=exp.get("duration", ""), key=f"duration_{i}")
+    st.text_area(f"Description {i+1}", value=exp.get("description", ""), key=f"description_{i}")
+
+if st.button("+ Add Experience"):
+    st.session_state.experience.append({"jobTitle": "", "company": "", "duration": "", "description": ""})
+
+if st.button("✨ Enhance Experience"):
+    body = api_json("/api/enhance-experience", {"experience": st.session_state.experience,
+                                                "previous": st.session_state.previous.get("experience")})
+    if body:
+        st.session_state.previous["experience"] = body
+        st.session_state.experience = body["experience"]
+        st.success("Experience enhanced ✅")
+
+# -------------------- Projects --------------------
+st.header("Projects")
+for i, proj in enumerate(st.session_state.projects):
+    st.text_input(f"Title {i+1}", value=proj.get("title", ""), key=f"proj_title_{i}")
+    st.text_area(f"Description {i+1}", value=proj.get("description", ""), key=f"proj_desc_{i}")
+    st.text_input(f"Technologies {i+1}", value=proj.get("technologies", ""), key=f"proj_tech_{i}")
+
+if st.button("+ Add Project"):
+    st.session_state.projects.append({"title": "", "description": "", "technologies": ""})
+
+if st.button("✨ Enhance Projects"):
+    body = api_json("/api/enhance-projects", {"projects": st.session_state.projects,
+                                              "previous": st.session_state.previous.get("projects")})
+    if body:
+        st.session_state.previous["projects"] = body
+        st.session_state.projects = body["projects"]
+        st.success("Projects enhanced ✅")
+
+# -------------------- Resume Assembly --------------------
+resume_data = {
+    "personalInfo": personal_info,
+    "summary": summary,
+    "skills": [s.strip() for s in skills if s.strip()],
+    "education": st.session_state.education,
+    "experience": st.session_state.experience,
+    "projects": st.session_state.projects,
+}
+
+# -------------------- Actions --------------------
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    if st.button("📄 Just Generate Resume"):
+        body = api_json("/generate-resume", {"data": resume_data, "template": template})
+        if body:
+            st.session_state.resumeData = body["resumeData"]
+            st.success("Resume preview ready ✅")
+
+with col2:
+    if st.button("✨ Enhance with AI"):
+        placeholder = st.empty()
+        partial = {}
+        for event in stream_events("/api/generate-ai-resume/stream", {"data": resume_data, "template": template}):
+            label = event.get("section", "")
+            if event.get("index") is not None:
+                label = f"{label} {event['index'] + 1}"
+            if event["event"] == "token":
+                partial[label] = partial.get(label, "") + event["text"]
+            elif event["event"] in ("reset", "degraded"):
+                partial[label] = ""
+            elif event["event"] == "section":
+                result = event["result"]
+                partial[label] = result.get("description", "") if label.startswith(("experience", "projects")) else str(result)
+            elif event["event"] == "error":
+                st.error(event["error"])
+            elif event["event"] == "done":
+                st.session_state.resumeData = event["data"]
+                st.success("AI-enhanced resume ready ✅")
+                if event.get("degraded"):
+                    warn_degraded(event["degraded"])
+            placeholder.markdown("\n\n".join(f"**{key}**\n\n{text}" for key, text in partial.items()))
+
+with col3:
+    if st.button("⬇️ Download PDF"):
+        res = api_session().post(f"{API_URL}/download-resume", json={"data": st.session_state.resumeData or resume_data, "template": template, "format": "pdf", "fitPages": fit_pages})
+        if res.ok:
+            st.download_button("Download Resume PDF", res.content, file_name="resume.pdf", mime="application/pdf")
+
+# -------------------- PDF Preview --------------------
+# Rendered server-side once per distinct (data, template); the iframe loads it by URL,
+# so widget edits elsewhere on the page only cost a HEAD, not a re-render or re-embed
+if st.session_state.resumeData:
+    st.subheader("📑 Resume Preview (PDF)")
+    url = preview_url(st.session_state.resumeData, template, fit_pages)
+    if url:
+        components.iframe(url, height=600)
@@ -0,0 +1,79 @@
+from docx import Document
+from docx.shared import Pt, RGBColor
+
+
+def _strip_marker(bullet):
+    # "List Bullet" draws its own marker; drop the "- " / "• " the LLM emits
+    return bullet.lstrip("-•* ").strip() or bullet
+
+
+def _heading(document, title, options):
+    paragraph = document.add_paragraph()
+    run = paragraph.add_run(title.upper() if options.get("uppercase_headings") else title)
+    run.bold = True
+    run.font.size = Pt(12)
+    run.font.color.rgb = RGBColor.from_string(options.get("accent", "000000"))
+    paragraph.paragraph_format.space_before = Pt(10)
+    paragraph.paragraph_format.space_after = Pt(4)
+
+
+def _labelled(document, label, rest):
+    paragraph = document.add_paragraph()
+    paragraph.add_run(label).bold = True
+    paragraph.add_run(rest)
+    return paragraph
+
+
+def build_docx_template(buffer, resume, options):
+    """Emit a ResumeDocument as DOCX. `options` are the template's docx_options."""
+    document = Document()
+    style = document.styles["Normal"]
+    style.font.name = "Calibri"
+    style.font.size = Pt(10)
+
+    # --- Header ---
+    if resume.name:
+        run = document.add_paragraph().add_run(resume.name)
+        run.bold = True
+        run.font.size = Pt(18)
+        run.font.color.rgb = RGBColor.from_string(options.get("accent", "000000"))
+    if resume.contact:
+        document.add_paragraph(resume.contact_line)
+
+    # --- Summary ---
+    if resume.summary:
+        _heading(document, "Professional Summary", options)
+        document.add_paragraph(resume.summary)
+
+    # --- Skills ---
+    if resume.skills:
+        _heading(document, "Skills", options)
+        document.add_paragraph(", ".join(resume.skills))
+
+    # --- Experience ---
+    if resume.experience:
+        _heading(document, "Experience", options)
+        for exp in resume.experience:
+            _labelled(document, exp.job_title, f", {exp.company} ({exp.duration})")
+            for bullet in exp.bullets:
+                document.add_paragraph(_strip_marker(bullet), style="List Bullet")
+
+    # --- Education ---
+    if resume.education:
+        _heading(document, "Education", options)
+        for edu in resume.education:
+            _labelled(document, edu.degree, f", {edu.institution} ({edu.year})")
+
+    # --- Projects ---
+    if resume.projects:
+        _heading(document, "Projects", options)
+        for proj in resume.projects:
+            _labelled(document, proj.title, f" — {proj.description}")
+
+    # --- Certifications ---
+    if resume.certifications:
+        _heading(document, "Certifications", options)
+        for cert in resume.certifications:
+            document.add_paragraph(f"{cert.title} — {cert.organization} ({cert.year})")
+
+    document.save(buffer)
@@ -0,0 +1,187 @@
+"""
+Fit a resume onto N pages by tightening spacing, then leading, then font size.
+
+Candidate layouts are scored by flowing wrap() heights through the template's
+frame geometry instead of running doc.build() per candidate. Paragraph heights
+are cached on (text, style metrics, width), so a paragraph is re-wrapped only
+when its font or leading changes; trying a different spacing is arithmetic.
+Only the chosen layout is rendered.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph, Spacer
+
+
+# Tried in order, gentlest first: (font scale, leading scale)
+LAYOUTS = tuple((font, leading) for font in (1.0, 0.95, 0.9, 0.85, 0.8) for leading in (1.0, 0.92))
+MIN_SPACING = 0.25
+SPACING_STEPS = 6
+# The estimate ignores a few ReportLab details (widows, space dropped at frame tops),
+# so a render that still overflows moves on to the next layout, up to this many renders
+MAX_RENDERS = 3
+DEFAULT_PADDING = 6
+
+Fit = namedtuple("Fit", "font_scale leading_scale spacing pages fits")
+
+_heights = OrderedDict()
+_heights_lock = threading.Lock()
+HEIGHT_CACHE_SIZE = 20000
+
+
+def fit_to_pages(template, buffer, document, pages):
+    """Render `document` with the gentlest layout estimated to fit `pages` pages; returns a Fit."""
+    pages = max(1, int(pages))
+    frames = frame_sizes(template)
+    probe = template.elements(document, template.styles)
+
+    # Layouts are ordered loosest to tightest, so binary-search for the first one that fits
+    low, high, spacings = 0, len(LAYOUTS), {}
+    while low < high:
+        middle = (low + high) // 2
+        spacings[middle] = _widest_spacing(probe, frames, _measurer(template, *LAYOUTS[middle]), pages)
+        if spacings[middle] is None:
+            low = middle + 1
+        else:
+            high = middle
+    fits = low < len(LAYOUTS)
+
+    index = min(low, len(LAYOUTS) - 1)
+    for _ in range(MAX_RENDERS):
+        font_scale, leading_scale = LAYOUTS[index]
+        if index not in spacings:
+            spacings[index] = _widest_spacing(probe, frames, _measurer(template, font_scale, leading_scale), pages)
+        # Nothing fits: the tightest layout is the best we can do
+        spacing = MIN_SPACING if spacings[index] is None else spacings[index]
+        styles = scale_styles(template.styles, font_scale, leading_scale)
+        buffer.seek(0)
+        buffer.truncate()
+        # At full scale this is byte-identical to a plain render
+        rendered = template.render(buffer, respace(template.elements(document, styles), spacing))
+        if rendered <= pages or index == len(LAYOUTS) - 1:
+            break
+        index += 1
+    return Fit(font_scale, leading_scale, spacing, rendered, fits and rendered <= pages)
+
+
+def frame_sizes(template):
+    """Usable (width, height) of each frame on a page, in flow order."""
+    if not template.frames:
+        page_width, page_height = template.doc_options["pagesize"]
+        options = template.doc_options
+        geometry = (0, 0, page_width - options["leftMargin"] - options["rightMargin"],
+                    page_height - options["topMargin"] - options["bottomMargin"])
+        return [_inner(geometry, {})]
+    return [_inner(geometry, options) for geometry, options in template.frames]
+
+
+def scale_styles(styles, font_scale, leading_scale):
+    if (font_scale, leading_scale) == (1.0, 1.0):
+        return styles
+    return {
+        name: ParagraphStyle(
+            style.name,
+            parent=style,
+            fontSize=style.fontSize * font_scale,
+            leading=style.leading * font_scale * leading_scale,
+        )
+        for name, style in styles.items()
+    }
+
+
+def respace(elements, spacing):
+    """Scale vertical gaps: paragraph space before/after, spacers and rule padding."""
+    if spacing == 1.0:
+        return elements
+    styles = {}
+    for flowable in elements:
+        if isinstance(flowable, Paragraph):
+            style = flowable.style
+            if id(style) not in styles:
+                styles[id(style)] = ParagraphStyle(style.name, parent=style, spaceBefore=style.spaceBefore * spacing,
+                                                   spaceAfter=style.spaceAfter * spacing)
+            flowable.style = styles[id(style)]
+        elif isinstance(flowable, Spacer):
+            flowable.height *= spacing
+        else:
+            for attr in ("spaceBefore", "spaceAfter"):
+                if isinstance(getattr(flowable, attr, None), (int, float)):
+                    setattr(flowable, attr, getattr(flowable, attr) * spacing)
+    return elements
+
+
+#Helpers
+def _inner(geometry, options):
+    _, _, width, height = geometry
+    padding = lambda side: options.get(side + "Padding", DEFAULT_PADDING)
+    return width - padding("left") - padding("right"), height - padding("top") - padding("bottom")
+
+
+def _widest_spacing(probe, frames, measure, pages):
+    """Largest spacing factor in [MIN_SPACING, 1] whose estimate fits, or None."""
+    if _pages_needed(probe, frames, measure, 1.0) <= pages:
+        return 1.0
+    if _pages_needed(probe, frames, measure, MIN_SPACING) > pages:
+        return None
+    low, high = MIN_SPACING, 1.0
+    for _ in range(SPACING_STEPS):
+        middle = (low + high) / 2
+        if _pages_needed(probe, frames, measure, middle) <= pages:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _pages_needed(elements, frames, measure, spacing):
+    """Estimate pages used when `elements` flow through `frames`, repeated on every page."""
+    index, used = 0, 0.0
+    for flowable in elements:
+        if getattr(flowable, "action", ("",))[0] == "frameEnd":
+            index, used = index + 1, 0.0
+            continue
+        width, height = frames[index % len(frames)]
+        body, gaps = measure(flowable, width, height)
+        needed = body + gaps * spacing
+        if used and used + needed > height:
+            if not isinstance(flowable, Paragraph):
+                # Unsplittable: starts at the top of the next frame
+                index, used = index + 1, 0.0
+        used += needed
+        # Paragraphs split across frames; carry the overflow
+        while used > height:
+            used -= height
+            index += 1
+            height = frames[index % len(frames)][1]
+    return index // len(frames) + 1
+
+
+def _measurer(template, font_scale, leading_scale):
+    """measure(flowable, width, height) -> (content height, vertical gaps) under scaled styles."""
+    scaled = scale_styles(template.styles, font_scale, leading_scale)
+    styles = {id(style): scaled[name] for name, style in template.styles.items()}
+
+    def measure(flowable, width, height):
+        if isinstance(flowable, Paragraph):
+            style = styles.get(id(flowable.style), flowable.style)
+            return _paragraph_height(flowable, style, width), style.spaceBefore + style.spaceAfter
+        if isinstance(flowable, Spacer):
+            return 0.0, flowable.height
+        _, body = flowable.wrap(width, height)
+        return body, flowable.getSpaceBefore() + flowable.getSpaceAfter()
+    return measure
+
+
+def _paragraph_height(paragraph, style, width):
+    key = (paragraph.text, paragraph.bulletText, round(width, 2), style.fontName, style.fontSize, style.leading,
+           style.leftIndent, style.rightIndent, style.firstLineIndent, style.bulletIndent, style.wordWrap)
+    with _heights_lock:
+        if key in _heights:
+            _heights.move_to_end(key)
+            return _heights[key]
+    _, height = Paragraph(paragraph.text, style, bulletText=paragraph.bulletText).wrap(width, 1e6)
+    with _heights_lock:
+        _heights[key] = height
+        while len(_heights) > HEIGHT_CACHE_SIZE:
+            _heights.popitem(last=False)
+    return height
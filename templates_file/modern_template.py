@@ -1,98 +1,120 @@
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Frame, PageTemplate, FrameBreak
+from xml.sax.saxutils import escape
+from reportlab.platypus import Paragraph, Spacer, FrameBreak
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib import colors
+from document_model import build_document
+from templates_file.registry import register_template
 
 
-def build_modern_template(buffer, data):
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        topMargin=40,
-        bottomMargin=30,
-        leftMargin=40,
-        rightMargin=40
-    )
-    styles = getSampleStyleSheet()
-
+def build_styles():
     # Custom styles
-    styles.add(ParagraphStyle(name="Name", fontName="Helvetica-Bold", fontSize=18, textColor=colors.HexColor("#1a237e"), spaceAfter=6))
-    styles.add(ParagraphStyle(name="SidebarHeader", fontName="Helvetica-Bold", fontSize=11, textColor=colors.white, backColor=colors.HexColor("#3949ab"), leftIndent=4, spaceBefore=8, spaceAfter=4))
-    styles.add(ParagraphStyle(name="SidebarText", fontName="Helvetica", fontSize=9, textColor=colors.white, leftIndent=6, leading=12))
-    styles.add(ParagraphStyle(name="SectionHeader", fontName="Helvetica-Bold", fontSize=12, textColor=colors.HexColor("#1a237e"), spaceBefore=10, spaceAfter=4))
-    styles.add(ParagraphStyle(name="NormalText", fontName="Helvetica", fontSize=10, leading=14))
+    return {
+        "Name": ParagraphStyle(name="Name", fontName="Helvetica-Bold", fontSize=18, textColor=colors.HexColor("#1a237e"), spaceAfter=6),
+        "SidebarHeader": ParagraphStyle(name="SidebarHeader", fontName="Helvetica-Bold", fontSize=11, textColor=colors.white, backColor=colors.HexColor("#3949ab"), leftIndent=4, spaceBefore=8, spaceAfter=4),
+        "SidebarText": ParagraphStyle(name="SidebarText", fontName="Helvetica", fontSize=9, textColor=colors.white, leftIndent=6, leading=12),
+        "SectionHeader": ParagraphStyle(name="SectionHeader", fontName="Helvetica-Bold", fontSize=12, textColor=colors.HexColor("#1a237e"), spaceBefore=10, spaceAfter=4),
+        "NormalText": ParagraphStyle(name="NormalText", fontName="Helvetica", fontSize=10, leading=14),
+    }
 
+
+def build_frames(doc_options):
     # Layout: Sidebar + Main content
-    width, height = A4
+    width, height = doc_options["pagesize"]
     sidebar_width = 140
-    frames = [
-        Frame(doc.leftMargin, doc.bottomMargin, sidebar_width, height - 70, showBoundary=0, leftPadding=6, rightPadding=6),
-        Frame(doc.leftMargin + sidebar_width + 20, doc.bottomMargin, width - sidebar_width - 80, height - 70, showBoundary=0)
+    left, bottom = doc_options["leftMargin"], doc_options["bottomMargin"]
+    return [
+        ((left, bottom, sidebar_width, height - 70), {"showBoundary": 0, "leftPadding": 6, "rightPadding": 6}),
+        ((left + sidebar_width + 20, bottom, width - sidebar_width - 80, height - 70), {"showBoundary": 0}),
     ]
 
-    doc.addPageTemplates([PageTemplate(frames=frames)])
-
-    elements = []
 
-    # --- SIDEBAR ---
-    personal_info = data.get("personalInfo", {})
-    elements.append(Paragraph(personal_info.get("name", "Your Name"), styles["Name"]))
+# --- SIDEBAR ---
+def render_sidebar(elements, styles, document):
+    elements.append(Paragraph(escape(document.name) if document.name is not None else "Your Name", styles["Name"]))
 
     # Contact
     elements.append(Paragraph("CONTACT", styles["SidebarHeader"]))
-    contact_lines = [
-        personal_info.get("email", ""),
-        personal_info.get("phone", ""),
-        personal_info.get("linkedin", ""),
-        personal_info.get("github", "")
-    ]
-    for line in filter(None, contact_lines):
-        elements.append(Paragraph(line, styles["SidebarText"]))
+    for line in document.contact:
+        elements.append(Paragraph(escape(line), styles["SidebarText"]))
 
     # Skills
-    if data.get("skills"):
+    if document.skills:
         elements.append(Paragraph("SKILLS", styles["SidebarHeader"]))
-        for skill in data["skills"]:
-            elements.append(Paragraph("• " + skill, styles["SidebarText"]))
+        for skill in document.skills:
+            elements.append(Paragraph("• " + escape(skill), styles["SidebarText"]))
 
     elements.append(FrameBreak())
 
-    # --- MAIN AREA ---
-    if data.get("summary"):
+
+# --- MAIN AREA ---
+def render_summary(elements, styles, document):
+    if document.summary:
         elements.append(Paragraph("Professional Summary", styles["SectionHeader"]))
-        elements.append(Paragraph(data["summary"], styles["NormalText"]))
+        elements.append(Paragraph(escape(document.summary), styles["NormalText"]))
         elements.append(Spacer(1, 8))
 
-    if data.get("experience"):
+
+def render_experience(elements, styles, document):
+    if document.experience:
         elements.append(Paragraph("Experience", styles["SectionHeader"]))
-        for exp in data["experience"]:
-            line = f"<b>{exp.get('jobTitle','')}</b>, {exp.get('company','')} ({exp.get('duration','')})"
+        for exp in document.experience:
+            line = f"<b>{escape(exp.job_title)}</b>, {escape(exp.company)} ({escape(exp.duration)})"
             elements.append(Paragraph(line, styles["NormalText"]))
-            if exp.get("description"):
-                for bullet in exp["description"].split("\n"):
-                    if bullet.strip():
-                        elements.append(Paragraph("• " + bullet.strip(), styles["NormalText"]))
+            for bullet in exp.bullets:
+                elements.append(Paragraph("• " + escape(bullet), styles["NormalText"]))
         elements.append(Spacer(1, 8))
 
-    if data.get("education"):
+
+def render_education(elements, styles, document):
+    if document.education:
         elements.append(Paragraph("Education", styles["SectionHeader"]))
-        for edu in data["education"]:
-            line = f"<b>{edu.get('degree','')}</b>, {edu.get('institution','')} ({edu.get('year','')})"
+        for edu in document.education:
+            line = f"<b>{escape(edu.degree)}</b>, {escape(edu.institution)} ({escape(edu.year)})"
             elements.append(Paragraph(line, styles["NormalText"]))
         elements.append(Spacer(1, 8))
 
-    if data.get("projects"):
+
+def render_projects(elements, styles, document):
+    if document.projects:
         elements.append(Paragraph("Projects", styles["SectionHeader"]))
-        for proj in data["projects"]:
-            line = f"<b>{proj.get('title','')}</b> — {proj.get('description','')}"
+        for proj in document.projects:
+            line = f"<b>{escape(proj.title)}</b> — {escape(proj.description)}"
             elements.append(Paragraph(line, styles["NormalText"]))
         elements.append(Spacer(1, 8))
 
-    if data.get("certifications"):
+
+def render_certifications(elements, styles, document):
+    if document.certifications:
         elements.append(Paragraph("Certifications", styles["SectionHeader"]))
-        for cert in data["certifications"]:
-            line = f"{cert.get('title','')} — {cert.get('organization','')} ({cert.get('year','')})"
+        for cert in document.certifications:
+            line = f"{escape(cert.title)} — {escape(cert.organization)} ({escape(cert.year)})"
             elements.append(Paragraph(line, styles["NormalText"]))
         elements.append(Spacer(1, 8))
 
-    doc.build(elements)
+
+MODERN_TEMPLATE = register_template(
+    "Modern",
+    build_styles,
+    sections=[
+        render_sidebar,
+        render_summary,
+        render_experience,
+        render_education,
+        render_projects,
+        render_certifications,
+    ],
+    doc_options={
+        "pagesize": A4,
+        "topMargin": 40,
+        "bottomMargin": 30,
+        "leftMargin": 40,
+        "rightMargin": 40,
+    },
+    build_frames=build_frames,
+    docx_options={"accent": "1A237E", "uppercase_headings": False},
+)
+
+
+def build_modern_template(buffer, data):
+    MODERN_TEMPLATE.build(buffer, build_document(data))
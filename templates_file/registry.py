@@ -0,0 +1,81 @@
+from types import MappingProxyType
+from reportlab.platypus import SimpleDocTemplate, Frame, PageTemplate
+from templates_file.docx_template import build_docx_template
+from templates_file.fit import fit_to_pages
+
+
+_TEMPLATES = {}
+
+
+class ResumeTemplate:
+    """
+    A resume layout whose styles and page geometry are built once at registration.
+
+    Only the per-render pieces (doc template, frames, flowables) are created in build();
+    ReportLab mutates Frame objects while laying out, so those cannot be shared.
+    """
+
+    def __init__(self, name, styles, sections, doc_options, frames=(), docx_options=None):
+        self.name = name
+        self.styles = MappingProxyType(dict(styles))
+        self.sections = tuple(sections)
+        self.doc_options = MappingProxyType(dict(doc_options))
+        self.frames = tuple((tuple(geometry), MappingProxyType(dict(options))) for geometry, options in frames)
+        self.docx_options = MappingProxyType(dict(docx_options or {}))
+
+    def build(self, buffer, document, fit_pages=None):
+        """
+        Render a document_model.ResumeDocument to PDF.
+        With fit_pages, spacing, leading and font size shrink until it fits that many pages.
+        """
+        if fit_pages:
+            return fit_to_pages(self, buffer, document, fit_pages)
+        self.render(buffer, self.elements(document, self.styles))
+
+    def elements(self, document, styles):
+        elements = []
+        for render_section in self.sections:
+            render_section(elements, styles, document)
+        return elements
+
+    def render(self, buffer, elements):
+        """Lay out flowables onto pages; returns the page count."""
+        doc = SimpleDocTemplate(buffer, **self.doc_options)
+        if self.frames:
+            doc.addPageTemplates([PageTemplate(frames=[Frame(*geometry, **options) for geometry, options in self.frames])])
+
+        doc.build(elements)
+        return doc.page
+
+    def build_docx(self, buffer, document):
+        """Render the same ResumeDocument to DOCX."""
+        build_docx_template(buffer, document, self.docx_options)
+
+
+def register_template(name, build_styles, sections, doc_options, build_frames=None, docx_options=None):
+    """
+    Register a template under `name`.
+
+    build_styles() -> {style name: ParagraphStyle}
+    sections       -> callables (elements, styles, document) appending flowables, in page order
+    build_frames(doc_options) -> [((x, y, width, height), frame kwargs), ...] or None for a single frame
+    docx_options   -> styling hints for the DOCX backend ("accent", "uppercase_headings")
+    """
+    template = ResumeTemplate(
+        name,
+        build_styles(),
+        sections,
+        doc_options,
+        build_frames(doc_options) if build_frames else (),
+        docx_options,
+    )
+    _TEMPLATES[name] = template
+    return template
+
+
+def get_template(name, default="Minimal"):
+    return _TEMPLATES.get(name) or _TEMPLATES[default]
+
+
+def template_names():
+    return list(_TEMPLATES)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from llm_cache import AsyncSingleFlight, SingleFlight
+
+
+WORDS = ["one ", "two ", "three ", "four "]
+
+
+def slow_words(closed):
+    def produce(members):
+        try:
+            for word in WORDS:
+                time.sleep(0.02)
+                yield word
+        finally:
+            closed.set()
+    return produce
+
+
+def test_follower_gets_full_text_when_leader_leaves():
+    flights, closed = SingleFlight(), threading.Event()
+    leader = flights.stream("key", slow_words(closed))
+    assert next(leader) == "one "
+    follower = flights.stream("key", slow_words(closed))
+    assert next(follower) == "one "
+
+    leader.close()
+    assert "".join(follower) == "two three four "
+    assert flights.coalesced == 1
+
+
+def test_last_caller_leaving_closes_the_generation():
+    flights, closed = SingleFlight(), threading.Event()
+    leader = flights.stream("key", slow_words(closed))
+    next(leader)
+    leader.close()
+    assert closed.wait(1)
+    assert flights.in_flight() == 0
+
+
+def test_async_follower_gets_full_text_when_leader_leaves():
+    async def produce(members):
+        for word in WORDS:
+            await asyncio.sleep(0.02)
+            yield word
+
+    async def main():
+        flights = AsyncSingleFlight()
+        leader = flights.stream("key", produce)
+        assert await anext(leader) == "one "
+        follower = flights.stream("key", produce)
+        await leader.aclose()
+        return "".join([chunk async for chunk in follower])
+
+    assert asyncio.run(main()) == "one two three four "
+
+
+def test_async_call_cancelled_when_last_caller_leaves():
+    cancelled = []
+
+    async def generate(members):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        flights = AsyncSingleFlight()
+        first = asyncio.ensure_future(flights.do("key", generate))
+        second = asyncio.ensure_future(flights.do("key", generate))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled
+        second.cancel()
+        await asyncio.sleep(0.01)
+        return flights.in_flight()
+
+    assert asyncio.run(main()) == 0
+    assert cancelled == [True]